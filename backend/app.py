@@ -1,16 +1,79 @@
 from flask import Flask, request, jsonify, make_response
 from flask_cors import CORS
 from models.util import Point
-from models.solar_calculator import calculate_solar_impact
-from models.reforestation_calculator import calculate_reforestation_impact
+from models.solar_calculator import calculate_solar_impact_async, get_simulation_cache_stats
+from models.reforestation_calculator import (
+    calculate_reforestation_impact_async,
+    calculate_reforestation_portfolio,
+    get_reverse_geocode_stats,
+)
+from models.reforestation_projection import parse_projection_options
+from models.solar_batch import calculate_solar_configurations
+from models.solar_optimizer import optimize_solar_orientation
+from models.solar_plots import PLOT_TYPES, get_plot_cache_stats, render_solar_plots_async
+from models.solar_multiyear import MAX_YEARS, calculate_solar_impact_multiyear
+from models.solar_profiles import parse_timeseries_options
+from models.solar_lifetime import parse_lifetime_options
+from models.solar_utils import get_emissions_factors_for_coordinates
+from models.winrock_store import STATISTICS
+from models.location_context import get_location_context_stats
+from models.geocoding import (
+    GeocodingError,
+    GeocodingUnavailableError,
+    geocode_address,
+    geocode_addresses,
+    get_geocode_stats,
+)
+from models.warmup import warm_up
+from models.weather_cache import get_weather_cache
+import asyncio
 import os
-import requests
 
 app = Flask(__name__)
 CORS(app)
 
+# Largest batch a single request may submit; each site may need a rate-limited reverse geocode
+REFORESTATION_BATCH_MAX_SITES = int(os.environ.get('REFORESTATION_BATCH_MAX_SITES', 100))
+# Configurations are simulated together, so memory grows with their number
+SOLAR_BATCH_MAX_CONFIGURATIONS = int(os.environ.get('SOLAR_BATCH_MAX_CONFIGURATIONS', 100))
+# Each address not in the geocoding cache is an upstream call
+GEOCODE_BATCH_MAX_ADDRESSES = int(os.environ.get('GEOCODE_BATCH_MAX_ADDRESSES', 100))
+
+def _is_number(value):
+    # bool is an int subclass, but true/false are not valid numbers in a request
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _is_coordinate(latitude, longitude):
+    return _is_number(latitude) and _is_number(longitude) and -90 <= latitude <= 90 and -180 <= longitude <= 180
+
+async def resolve_location(data):
+    """
+    Get the request's coordinates, geocoding its address if no coordinates were given.
+
+    Returns:
+        Point: The request location
+    """
+    latitude = data.get('latitude', 0)
+    longitude = data.get('longitude', 0)
+    address = data.get('address', None)
+
+    if (not latitude and not longitude and address):
+        print("getting lat/lon for address")
+        latitude, longitude = await asyncio.to_thread(geocode_address, address)
+
+    return Point(latitude, longitude)
+
+@app.errorhandler(GeocodingError)
+def geocoding_failed(e):
+    return jsonify({'error': str(e)}), 400
+
+@app.errorhandler(GeocodingUnavailableError)
+def geocoding_unavailable(e):
+    # The upstream service failed, not the request
+    return jsonify({'error': str(e)}), 503
+
 @app.route('/api/calculate', methods=['POST', 'OPTIONS'])
-def calculate_impact():
+async def calculate_impact():
     # Handle preflight request
     if request.method == 'OPTIONS':
         response = make_response()
@@ -21,27 +84,16 @@ def calculate_impact():
 
     # Handle actual request
     data = request.json
+    try:
+        timeseries = parse_timeseries_options(data.get('timeseries'))
+        lifetime = parse_lifetime_options(data.get('lifetime'))
+        projection = parse_projection_options(data.get('projection'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    latitude = data.get('latitude', 0)
-    longitude = data.get('longitude', 0)
-    address = data.get('address', None)
-
-    if (not latitude and not longitude and address):
-        print("getting lat/lon for address")
-
-        address = address.replace(" ", "+")
-        geocode_api_key = os.environ.get('GEOCODE_MAPS_API_KEY')
-        payload = { 'q': address, 'api_key': geocode_api_key  }
-        url = 'https://geocode.maps.co/search'
-        r = requests.get(url, params=payload)
-        r.raise_for_status()
-
-        latitude = float(r.json()[0]['lat'])
-        longitude = float(r.json()[0]['lon'])
-
-    location = Point(latitude, longitude)
+    location = await resolve_location(data)
     orientation = data.get('orientation', 'SOUTH')
-    if(latitude < 0):
+    if(location.lat < 0):
         orientation = 'NORTH'
     
     areaSquareMeters = data.get('area', 0)
@@ -50,14 +102,19 @@ def calculate_impact():
     land_use_type = data.get('landUseType', 'solar')
     
     if land_use_type == 'reforestation':
-        result = calculate_reforestation_impact(
+        country_statistic = data.get('countryStatistic', 'median')
+        if country_statistic not in STATISTICS:
+            return jsonify({'error': f"countryStatistic must be one of {', '.join(STATISTICS)}"}), 400
+        result = await calculate_reforestation_impact_async(
             areaHectares, 
-            location
+            location,
+            country_statistic, # aggregate used when no subnational unit matches
+            projection # optional horizon and growth curve
         )
         print(result)
     elif land_use_type == 'solar':  
         # Extract all solar parameters with defaults
-        result = calculate_solar_impact(
+        result = await calculate_solar_impact_async(
             area_hectares=areaHectares,
             location=location,
             altitude_meters=data.get('altitude', 10),
@@ -65,7 +122,12 @@ def calculate_impact():
             pv_panel_model=data.get('pv_panel_model', "Canadian_Solar_CS5P_220M___2009_"),
             inverter_model=data.get('inverter_model', "ABB__MICRO_0_25_I_OUTD_US_208__208V_"),
             array_tilt=data.get('array_tilt'), # if not provided, defaults to abs(latitude)
-            simulation_year=data.get('simulation_year', 2022)
+            simulation_year=data.get('simulation_year', 2022),
+            engine=data.get('engine', 'pvlib'), # 'numpy' for the fused fast path
+            use_float32=data.get('use_float32', False),
+            estimate=data.get('estimate', False), # precomputed yield surface, falls back to the full simulation
+            timeseries=timeseries, # optional monthly / month-by-hour / downsampled hourly sections
+            lifetime=lifetime # optional multi-year projection with degradation
         )
         print(result)
     else:
@@ -75,10 +137,226 @@ def calculate_impact():
     
     return jsonify(result)
 
+@app.route('/api/reforestation/batch', methods=['POST'])
+async def reforestation_batch():
+    """
+    Project reforestation removals for many sites at once. Expects 'sites', a list of
+    {'latitude', 'longitude', 'area'} (area in square meters, as in /api/calculate),
+    plus the optional 'countryStatistic' and 'projection' options.
+    """
+    data = request.json
+    sites = data.get('sites')
+    if not isinstance(sites, list) or not sites or not all(
+        isinstance(site, dict)
+        and _is_coordinate(site.get('latitude'), site.get('longitude'))
+        and _is_number(site.get('area')) and site['area'] > 0
+        for site in sites
+    ):
+        return jsonify({'error': 'sites must be a non-empty list of {latitude, longitude, area} with a positive area'}), 400
+    if len(sites) > REFORESTATION_BATCH_MAX_SITES:
+        return jsonify({'error': f'At most {REFORESTATION_BATCH_MAX_SITES} sites per request'}), 400
+    country_statistic = data.get('countryStatistic', 'median')
+    if country_statistic not in STATISTICS:
+        return jsonify({'error': f"countryStatistic must be one of {', '.join(STATISTICS)}"}), 400
+    try:
+        projection = parse_projection_options(data.get('projection'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    result = await calculate_reforestation_portfolio(
+        [
+            {'location': Point(site['latitude'], site['longitude']), 'areaHectares': site['area'] / 10000}
+            for site in sites
+        ],
+        country_statistic,
+        projection,
+    )
+    return jsonify(result)
+
+@app.route('/api/solar/batch', methods=['POST'])
+async def calculate_solar_batch():
+    """
+    Evaluate a list of solar configurations for one site in a single vectorized pass.
+    Expects the same location/area fields as /api/calculate plus 'configurations'.
+    """
+    data = request.json
+    configurations = data.get('configurations')
+    if not isinstance(configurations, list) or not configurations:
+        return jsonify({'error': 'configurations must be a non-empty list'}), 400
+    if len(configurations) > SOLAR_BATCH_MAX_CONFIGURATIONS:
+        return jsonify({'error': f'At most {SOLAR_BATCH_MAX_CONFIGURATIONS} configurations per request'}), 400
+    try:
+        lifetime = parse_lifetime_options(data.get('lifetime'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    location = await resolve_location(data)
+    areaHectares = data.get('area', 0) / 10000
+
+    try:
+        result = await asyncio.to_thread(
+            calculate_solar_configurations,
+            area_hectares=areaHectares,
+            location=location,
+            configurations=configurations,
+            altitude_meters=data.get('altitude', 10),
+            simulation_year=data.get('simulation_year', 2022),
+            lifetime=lifetime
+        )
+    except ValueError as e:
+        # e.g. an unknown orientation in one of the configurations
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/api/solar/optimize', methods=['POST'])
+async def optimize_solar():
+    """
+    Search tilt and azimuth for the highest annual AC energy at a site.
+    Expects the same location/area/model fields as /api/calculate.
+    """
+    data = request.json
+    if not all(isinstance(data.get(key, ''), str) for key in ('pv_panel_model', 'inverter_model')):
+        return jsonify({'error': 'pv_panel_model and inverter_model must be model names'}), 400
+    location = await resolve_location(data)
+    areaHectares = data.get('area', 0) / 10000
+
+    try:
+        result = await asyncio.to_thread(
+            optimize_solar_orientation,
+            area_hectares=areaHectares,
+            location=location,
+            altitude_meters=data.get('altitude', 10),
+            pv_panel_model=data.get('pv_panel_model', "Canadian_Solar_CS5P_220M___2009_"),
+            inverter_model=data.get('inverter_model', "ABB__MICRO_0_25_I_OUTD_US_208__208V_"),
+            simulation_year=data.get('simulation_year', 2022)
+        )
+    except ValueError as e:
+        # e.g. an unknown panel or inverter model
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/api/solar/multiyear', methods=['POST'])
+async def solar_multiyear():
+    """
+    Simulate a range of weather years and report per-year, mean, P50 and P90 energy.
+    Expects the same fields as /api/calculate, plus 'start_year' and 'end_year'.
+    """
+    data = request.json
+    start_year = data.get('start_year', 2010)
+    end_year = data.get('end_year', 2020)
+    if not all(isinstance(year, int) and not isinstance(year, bool) for year in (start_year, end_year)) \
+            or end_year < start_year:
+        return jsonify({'error': 'start_year and end_year must be years with start_year <= end_year'}), 400
+    if end_year - start_year + 1 > MAX_YEARS:
+        return jsonify({'error': f'At most {MAX_YEARS} years can be simulated at once'}), 400
+
+    location = await resolve_location(data)
+    orientation = data.get('orientation', 'SOUTH')
+    if(location.lat < 0):
+        orientation = 'NORTH'
+
+    try:
+        result = await asyncio.to_thread(
+            calculate_solar_impact_multiyear,
+            area_hectares=data.get('area', 0) / 10000,
+            location=location,
+            start_year=start_year,
+            end_year=end_year,
+            altitude_meters=data.get('altitude', 10),
+            orientation=orientation,
+            pv_panel_model=data.get('pv_panel_model', "Canadian_Solar_CS5P_220M___2009_"),
+            inverter_model=data.get('inverter_model', "ABB__MICRO_0_25_I_OUTD_US_208__208V_"),
+            array_tilt=data.get('array_tilt')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/api/solar/plots', methods=['POST'])
+async def solar_plots():
+    """
+    Render the weather and AC output charts as base64 PNGs.
+    Expects the same fields as /api/calculate, plus an optional 'plots' list
+    ('weather', 'acOutput'; both by default).
+    """
+    data = request.json
+    plots = data.get('plots', list(PLOT_TYPES))
+    if not isinstance(plots, list) or any(plot not in PLOT_TYPES for plot in plots):
+        return jsonify({'error': f"plots must be a list of {', '.join(PLOT_TYPES)}"}), 400
+
+    location = await resolve_location(data)
+    orientation = data.get('orientation', 'SOUTH')
+    if(location.lat < 0):
+        orientation = 'NORTH'
+
+    result = await render_solar_plots_async(
+        area_hectares=data.get('area', 0) / 10000,
+        location=location,
+        altitude_meters=data.get('altitude', 10),
+        orientation=orientation,
+        pv_panel_model=data.get('pv_panel_model', "Canadian_Solar_CS5P_220M___2009_"),
+        inverter_model=data.get('inverter_model', "ABB__MICRO_0_25_I_OUTD_US_208__208V_"),
+        array_tilt=data.get('array_tilt'),
+        simulation_year=data.get('simulation_year', 2022),
+        plots=plots
+    )
+    return jsonify(result)
+
+@app.route('/api/emissions/batch', methods=['POST'])
+def emissions_batch():
+    """
+    Resolve a list of [latitude, longitude] pairs to country codes and grid emissions factors.
+    """
+    coordinates = request.json.get('coordinates')
+    if not isinstance(coordinates, list) or not coordinates or not all(
+        isinstance(c, list) and len(c) == 2 and _is_coordinate(*c) for c in coordinates
+    ):
+        return jsonify({'error': 'coordinates must be a non-empty list of [latitude, longitude] pairs in range'}), 400
+
+    latitudes, longitudes = zip(*coordinates)
+    iso_codes, country_names, emissions_factors = get_emissions_factors_for_coordinates(latitudes, longitudes)
+    return jsonify({
+        'results': [
+            {'isoCode': str(iso_code), 'country': country, 'gridEmissionsFactor': emissions_factor}
+            for iso_code, country, emissions_factor in zip(iso_codes, country_names, emissions_factors)
+        ]
+    })
+
+@app.route('/api/geocode/batch', methods=['POST'])
+def geocode_batch():
+    """
+    Resolve a list of addresses to coordinates, one result per address.
+    """
+    addresses = request.json.get('addresses')
+    if not isinstance(addresses, list) or not addresses or not all(isinstance(address, str) for address in addresses):
+        return jsonify({'error': 'addresses must be a non-empty list of strings'}), 400
+    if len(addresses) > GEOCODE_BATCH_MAX_ADDRESSES:
+        return jsonify({'error': f'At most {GEOCODE_BATCH_MAX_ADDRESSES} addresses per request'}), 400
+
+    return jsonify({'results': geocode_addresses(addresses)})
+
+@app.route('/api/stats', methods=['GET'])
+def cache_stats():
+    """
+    Report cache hit rates and queue depths of this worker process.
+    """
+    return jsonify({
+        'reverseGeocode': get_reverse_geocode_stats(),
+        'weatherCache': get_weather_cache().stats(),
+        'locationContext': get_location_context_stats(),
+        'simulationCache': get_simulation_cache_stats(),
+        'plotCache': get_plot_cache_stats(),
+        'forwardGeocode': get_geocode_stats(),
+    })
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"}), 200
 
+# Preload data for the request path once per process (or once before forking with a preloading server)
+if os.environ.get('WARMUP_ON_START', 'true').lower() == 'true':
+    warm_up()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 3000))
     app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_ENV') == 'development')
@@ -0,0 +1,65 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Modules that must stay off the import path of app.py
+LAZY_MODULES = ['matplotlib', 'timezonefinder']
+
+
+def measure_import(module='app'):
+    """
+    Import a module in a fresh interpreter with -X importtime, without the startup warm-up.
+
+    Returns:
+        tuple: (total seconds, {module: cumulative seconds}, set of loaded module names)
+    """
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    env = dict(os.environ, WARMUP_ON_START='false')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, _, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|').split('|')]
+        cumulative[name] = int(cumulative_us) / 1e6
+    return cumulative[module], cumulative, set(result.stdout.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import time")
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="number of slowest top-level imports to list")
+    parser.add_argument('--budget', type=float, help="fail if the median import time exceeds this many seconds")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.repeat):
+        total, cumulative, loaded = measure_import(args.module)
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.3f}s, min {min(totals):.3f}s over {args.repeat} runs")
+    print("Slowest imports (cumulative, last run):")
+    for name, seconds in sorted(cumulative.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"  {seconds:.3f}s  {name}")
+
+    failures = [f"{name} is imported eagerly" for name in LAZY_MODULES if name in loaded]
+    if args.budget is not None and median > args.budget:
+        failures.append(f"median import time {median:.3f}s is over the {args.budget:.3f}s budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Lets tests import the backend packages (models, ...) the way app.py does
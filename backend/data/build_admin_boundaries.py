@@ -0,0 +1,54 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.admin_boundaries import (  # noqa: E402
+    DEFAULT_NODE_CAPACITY,
+    build_admin_boundaries,
+    save_admin_boundaries,
+)
+from models.reforestation_calculator import get_winrock_data  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the offline admin-1 boundary index used to resolve reforestation locations "
+                    "to Winrock subnational units without Nominatim."
+    )
+    parser.add_argument('geojson', help="Admin-1 boundaries, e.g. Natural Earth ne_10m_admin_1_states_provinces.geojson")
+    parser.add_argument('--output', default=str(Path(__file__).parent / 'admin_boundaries'))
+    parser.add_argument('--name-field', default='name')
+    parser.add_argument('--iso-field', default='iso_3166_2', help="ISO 3166-2 subdivision code field")
+    parser.add_argument('--country-field', default='admin')
+    parser.add_argument('--country-iso-field', default='iso_a2', help="ISO 3166-1 alpha-2 country code field")
+    parser.add_argument('--node-capacity', type=int, default=DEFAULT_NODE_CAPACITY)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.geojson, encoding='utf-8') as f:
+        features = json.load(f)['features']
+
+    index = build_admin_boundaries(
+        features, get_winrock_data(),
+        name_field=args.name_field,
+        iso_field=args.iso_field,
+        country_field=args.country_field,
+        country_iso_field=args.country_iso_field,
+        node_capacity=args.node_capacity,
+    )
+    save_admin_boundaries(index, args.output)
+
+    regions = index['regions']
+    in_winrock = sum(1 for region in regions if region['country'])
+    matched = sum(1 for region in regions if region['subnationalUnit'])
+    print(f"Indexed {len(index['polygon_regions'])} polygons of {len(regions)} regions "
+          f"({in_winrock} in Winrock countries, {matched} matched to a unit) "
+          f"in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+import numpy as np
+import pvlib
+
+# Parameters read by pvlib's SAPM (sapm, sapm_effective_irradiance) and Sandia inverter models
+PANEL_PARAMETERS = [
+    'Cells_in_Series', 'Isco', 'Voco', 'Impo', 'Vmpo', 'Aisc', 'Aimp',
+    'C0', 'C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7',
+    'Bvoco', 'Mbvoc', 'Bvmpo', 'Mbvmp', 'N', 'IXO', 'IXXO',
+    'A0', 'A1', 'A2', 'A3', 'A4', 'B0', 'B1', 'B2', 'B3', 'B4', 'B5', 'FD',
+]
+INVERTER_PARAMETERS = ['Paco', 'Pdco', 'Vdco', 'Pso', 'C0', 'C1', 'C2', 'C3', 'Pnt']
+
+
+def build_table(database, parameters):
+    """
+    Turn a SAM database (one column per model) into a float64 matrix with one row per model.
+
+    Returns:
+        tuple: (matrix, model names in row order)
+    """
+    table = database.loc[parameters].T.astype(float)
+    return np.ascontiguousarray(table.to_numpy()), list(table.index)
+
+
+def build_model_store():
+    """
+    Build the compact panel/inverter store used by get_panel_specs/get_inverter_specs:
+    sam_panels.npy (Sandia modules) and sam_inverters.npy (CEC inverters) hold only
+    the SAPM/Sandia parameters, and sam_models.json maps each model name to its row.
+    """
+    data_dir = Path(__file__).parent
+
+    # get_panel_specs checks the CEC database first, so leave out Sandia names it shadows
+    sandia = pvlib.pvsystem.retrieve_sam('SandiaMod')
+    cec_names = set(pvlib.pvsystem.retrieve_sam('CECMod').columns)
+    sandia = sandia[[name for name in sandia.columns if name not in cec_names]]
+
+    panels, panel_names = build_table(sandia, PANEL_PARAMETERS)
+    inverters, inverter_names = build_table(pvlib.pvsystem.retrieve_sam('cecinverter'), INVERTER_PARAMETERS)
+
+    np.save(data_dir / 'sam_panels.npy', panels)
+    np.save(data_dir / 'sam_inverters.npy', inverters)
+    index = {
+        'pvlibVersion': pvlib.__version__,
+        'panels': {'parameters': PANEL_PARAMETERS, 'names': panel_names},
+        'inverters': {'parameters': INVERTER_PARAMETERS, 'names': inverter_names},
+    }
+    with open(data_dir / 'sam_models.json', 'w') as f:
+        json.dump(index, f)
+
+    print(f"Model store complete: {len(panel_names)} panels, {len(inverter_names)} inverters. Results saved to sam_models.json")
+
+
+if __name__ == "__main__":
+    build_model_store()
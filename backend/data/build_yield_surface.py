@@ -0,0 +1,126 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.solar_calculator import (  # noqa: E402
+    get_panel_specs,
+    get_solar_weather_data,
+    simulate_pv_output,
+)
+from models.weather_cache import get_weather_cache  # noqa: E402
+from models.weather_grid import snap_to_weather_grid  # noqa: E402
+from models.yield_surface import AC_LAYER, DC_LAYER  # noqa: E402
+
+DEFAULT_PANEL_MODEL = "Canadian_Solar_CS5P_220M___2009_"
+DEFAULT_INVERTER_MODEL = "ABB__MICRO_0_25_I_OUTD_US_208__208V_"
+
+
+def load_weather(latitude, longitude, year, download):
+    """
+    Get weather for a grid node from the local weather cache, or from the
+    providers when download is set.
+
+    Returns:
+        tuple: (weather_cell, solar_weather_timeseries), with None for the timeseries if unavailable
+    """
+    cell = snap_to_weather_grid(latitude, longitude)
+    if download:
+        try:
+            timeseries, _, _ = get_solar_weather_data(latitude, longitude, year)
+        except Exception as e:
+            print(f"No weather for ({latitude}, {longitude}): {str(e)}")
+            timeseries = None
+        return cell, timeseries
+
+    cache_year = year if cell['provider'] == 'psm3' else 'tmy'
+    cached = get_weather_cache().get(cell['provider'], cell['latitude'], cell['longitude'], cache_year)
+    return cell, cached[0] if cached is not None else None
+
+
+def build_yield_surface(
+    step=1.0,
+    lat_min=-60.0,
+    lat_max=72.0,
+    lon_min=-180.0,
+    lon_max=180.0,
+    year=2022,
+    altitude_meters=10,
+    pv_panel_model=DEFAULT_PANEL_MODEL,
+    inverter_model=DEFAULT_INVERTER_MODEL,
+    download=False,
+    output_dir=None,
+):
+    """
+    Simulate the default layout (equator facing, tilt = abs(latitude), one panel)
+    at every node of a lat/lon grid and save the annual specific yield as
+    yield_surface.npy (float32, layers x latitudes x longitudes) plus a
+    yield_surface.json header in output_dir (default: this directory).
+    Nodes without weather data are stored as NaN.
+    """
+    data_dir = Path(output_dir) if output_dir else Path(__file__).parent
+    latitudes = np.arange(lat_min, lat_max + step / 2, step)
+    longitudes = np.arange(lon_min, lon_max + step / 2, step)
+
+    panel = get_panel_specs(pv_panel_model)
+    panel_kwp = panel['Impo'] * panel['Vmpo'] / 1000
+
+    surface = np.full((2, len(latitudes), len(longitudes)), np.nan, dtype=np.float32)
+    filled = 0
+    for i, latitude in enumerate(latitudes):
+        for j, longitude in enumerate(longitudes):
+            cell, timeseries = load_weather(float(latitude), float(longitude), year, download)
+            if timeseries is None:
+                continue
+
+            pv_output = simulate_pv_output(
+                timeseries,
+                cell['latitude'],
+                cell['longitude'],
+                altitude_meters,
+                abs(cell['latitude']),
+                0 if cell['latitude'] < 0 else 180,
+                pv_panel_model,
+                inverter_model,
+                1,
+            )
+            surface[AC_LAYER, i, j] = pv_output["AC Output (Wh)"].sum() / 1000 / panel_kwp
+            surface[DC_LAYER, i, j] = pv_output["DC Output (Wh)"].sum() / 1000 / panel_kwp
+            filled += 1
+        print(f"Latitude {latitude:.2f}: {filled} nodes filled so far")
+
+    np.save(data_dir / 'yield_surface.npy', surface)
+    header = {
+        'latMin': float(latitudes[0]),
+        'lonMin': float(longitudes[0]),
+        'stepDegrees': float(step),
+        'shape': list(surface.shape),
+        'units': 'kWh/kWp/yr',
+        'layers': {'ac': AC_LAYER, 'dc': DC_LAYER},
+        'panelModel': pv_panel_model,
+        'inverterModel': inverter_model,
+        'panelKwp': float(panel_kwp),
+        'year': year,
+        'altitude': altitude_meters,
+        'filledNodes': filled,
+        'created': time.time(),
+    }
+    with open(data_dir / 'yield_surface.json', 'w') as f:
+        json.dump(header, f, indent=2)
+
+    print(f"Yield surface complete: {filled} of {surface[0].size} nodes filled. Results saved to yield_surface.npy")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the global specific-yield surface")
+    parser.add_argument('--step', type=float, default=1.0, help="grid spacing in degrees")
+    parser.add_argument('--year', type=int, default=2022, help="PSM3 weather year (PVGIS is always TMY)")
+    parser.add_argument('--download', action='store_true',
+                        help="fetch weather missing from the local cache (needs API credentials)")
+    parser.add_argument('--output-dir', help="where to write yield_surface.npy/.json (default: this directory)")
+    args = parser.parse_args()
+    build_yield_surface(step=args.step, year=args.year, download=args.download, output_dir=args.output_dir)
@@ -1,9 +1,14 @@
-from openpyxl import load_workbook
+import argparse
 import json
+import sys
 from pathlib import Path
 import numpy as np
 import csv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.winrock_store import build_winrock_store, save_winrock_store  # noqa: E402
+
 def calculate_average(values, start_idx, end_idx):
     """
     Calculate average of numeric values in a range, ignoring 'N/A' values.
@@ -53,6 +58,8 @@ def process_row_values(values, row_idx):
 
 def preprocess_Winrock_data():
     """Preprocess Winrock data from Excel to JSON format"""
+    from openpyxl import load_workbook
+
     data_dir = Path(__file__).parent
     
     # Load Excel workbook
@@ -94,6 +101,29 @@ def preprocess_Winrock_data():
                 writer.writerow([country, unit] + [values[heading] for heading in column_headings])
     
     print("Data preprocessing complete. Results saved to Winrock_data.json")
+    return data
+
+def write_Winrock_store(data):
+    """
+    Write the memory-mapped store read at runtime: Winrock_values.npy (one row per
+    subnational unit, NaN for N/A), Winrock_aggregates.npy (per-country medians and
+    means, over all units and over Coastal/NatRegen units) and Winrock_index.json
+    (columns, unit names and each country's row range).
+    """
+    values, aggregates, index = build_winrock_store(data)
+    save_winrock_store(values, aggregates, index, Path(__file__).parent)
+    print(f"Winrock store complete: {values.shape[0]} units in {len(index['countries'])} countries. "
+          "Results saved to Winrock_values.npy, Winrock_aggregates.npy and Winrock_index.json")
 
 if __name__ == "__main__":
-    preprocess_Winrock_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Preprocess the Winrock FLR workbook into the JSON/TSV files and the runtime store.")
+    parser.add_argument('--from-json', action='store_true',
+                        help="Rebuild the store from the existing Winrock_data.json instead of the Excel workbook")
+    args = parser.parse_args()
+
+    if args.from_json:
+        with open(Path(__file__).parent / 'Winrock_data.json') as f:
+            data = json.load(f)
+    else:
+        data = preprocess_Winrock_data()
+    write_Winrock_store(data)
\ No newline at end of file
@@ -0,0 +1,282 @@
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+# Default location of the prebuilt index (see data/build_admin_boundaries.py)
+_DEFAULT_BOUNDARIES_DIR = Path(__file__).parent.parent / 'data' / 'admin_boundaries'
+
+# Children per R-tree node
+DEFAULT_NODE_CAPACITY = 16
+
+_admin_boundaries = None  # Module-level boundaries instance
+_admin_boundaries_loaded = False
+_admin_boundaries_lock = threading.Lock()
+
+
+def _polygon_parts(geometry):
+    """
+    Split a GeoJSON Polygon or MultiPolygon into polygons, each a list of rings
+    of [longitude, latitude] positions (exterior first, then holes).
+    """
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+def _polygon_edges(rings):
+    """
+    Edges of all rings of a polygon as (x1, y1, x2, y2) rows.
+    """
+    edges = []
+    for ring in rings:
+        ring = np.asarray(ring, dtype=float)[:, :2]
+        if len(ring) < 3:
+            continue
+        # GeoJSON rings are closed; close them anyway in case the source is sloppy
+        if not np.array_equal(ring[0], ring[-1]):
+            ring = np.vstack([ring, ring[:1]])
+        edges.append(np.hstack([ring[:-1], ring[1:]]))
+    return np.vstack(edges) if edges else np.empty((0, 4))
+
+
+def _match_region(properties, winrock_data, name_field, iso_field, country_field, country_iso_field):
+    """
+    Resolve a boundary feature to its Winrock country and subnational unit with the
+    same ISO-then-name matching the Nominatim path uses.
+
+    Returns:
+        dict: 'name', 'country', 'subnationalUnit' and 'matchInfo'; country is None
+            for countries Winrock does not cover, subnationalUnit None when no unit matched
+    """
+    from .reforestation_utils import get_subnational_unit, normalize_to_Winrock_country_name
+
+    name = properties.get(name_field)
+    subdivision_code = properties.get(iso_field) or ''
+    country_code = properties.get(country_iso_field) or subdivision_code
+    region = {'name': name, 'country': None, 'subnationalUnit': None, 'matchInfo': None}
+
+    country = normalize_to_Winrock_country_name(properties.get(country_field) or country_code, country_code)
+    if country not in winrock_data:
+        return region
+    region['country'] = country
+
+    # The fields Nominatim would return for the same place
+    address = {}
+    if '-' in subdivision_code:
+        address['ISO3166-2-lvl4'] = subdivision_code
+    if name:
+        address['state'] = name
+    unit, match_info = get_subnational_unit(address, list(winrock_data[country]))
+    if unit:
+        region['subnationalUnit'] = unit
+        region['matchInfo'] = dict(match_info, source='boundaries')
+    return region
+
+
+def _str_order(bboxes, node_capacity):
+    """
+    Sort-Tile-Recursive packing order: slice by x center, then order each slice by y center.
+    """
+    n = len(bboxes)
+    slices = int(np.ceil(np.sqrt(np.ceil(n / node_capacity))))
+    slice_size = slices * node_capacity
+    centers = (bboxes[:, :2] + bboxes[:, 2:]) / 2
+    by_x = np.argsort(centers[:, 0], kind='stable')
+    return np.concatenate([
+        chunk[np.argsort(centers[chunk, 1], kind='stable')]
+        for chunk in (by_x[i:i + slice_size] for i in range(0, n, slice_size))
+    ])
+
+
+def _tree_levels(bboxes, node_capacity):
+    """
+    Bounding boxes of each R-tree level, leaves first. Node i of a level covers
+    children i * node_capacity to (i + 1) * node_capacity of the level below.
+    """
+    levels = [bboxes]
+    while len(levels[-1]) > 1:
+        below = levels[-1]
+        starts = np.arange(0, len(below), node_capacity)
+        levels.append(np.column_stack([
+            np.minimum.reduceat(below[:, 0], starts),
+            np.minimum.reduceat(below[:, 1], starts),
+            np.maximum.reduceat(below[:, 2], starts),
+            np.maximum.reduceat(below[:, 3], starts),
+        ]))
+    return levels
+
+
+def build_admin_boundaries(
+    features,
+    winrock_data,
+    name_field='name',
+    iso_field='iso_3166_2',
+    country_field='admin',
+    country_iso_field='iso_a2',
+    node_capacity=DEFAULT_NODE_CAPACITY,
+):
+    """
+    Build the boundary index from admin-1 GeoJSON features. Defaults match the
+    field names of the Natural Earth admin-1 states/provinces layer.
+
+    Every feature is mapped to its Winrock country and unit here, once; each polygon
+    of a MultiPolygon becomes its own R-tree leaf pointing at the feature's region.
+
+    Returns:
+        dict: Arrays and 'regions' list, as taken by AdminBoundaries
+    """
+    regions = []
+    polygon_regions = []
+    polygon_edges = []
+    for feature in features:
+        parts = [_polygon_edges(rings) for rings in _polygon_parts(feature.get('geometry'))]
+        parts = [edges for edges in parts if len(edges)]
+        if not parts:
+            continue
+        region_index = len(regions)
+        regions.append(_match_region(
+            feature.get('properties') or {}, winrock_data,
+            name_field, iso_field, country_field, country_iso_field,
+        ))
+        polygon_regions.extend([region_index] * len(parts))
+        polygon_edges.extend(parts)
+
+    if not polygon_edges:
+        raise ValueError("No polygon features to index")
+
+    bboxes = np.array([
+        [edges[:, [0, 2]].min(), edges[:, [1, 3]].min(), edges[:, [0, 2]].max(), edges[:, [1, 3]].max()]
+        for edges in polygon_edges
+    ])
+    order = _str_order(bboxes, node_capacity)
+    edge_counts = np.array([len(polygon_edges[i]) for i in order])
+
+    return {
+        'nodeCapacity': node_capacity,
+        'regions': regions,
+        'levels': _tree_levels(bboxes[order], node_capacity),
+        'polygon_regions': np.asarray(polygon_regions, dtype=np.int32)[order],
+        'edge_offsets': np.concatenate([[0], np.cumsum(edge_counts)]).astype(np.int64),
+        'edges': np.vstack([polygon_edges[i] for i in order]),
+    }
+
+
+def save_admin_boundaries(index, directory):
+    """
+    Write a built index as .npy files plus an index.json header.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for i, level in enumerate(index['levels']):
+        np.save(directory / f'level_{i}.npy', level)
+    for name in ('polygon_regions', 'edge_offsets', 'edges'):
+        np.save(directory / f'{name}.npy', index[name])
+    with open(directory / 'index.json', 'w') as f:
+        json.dump({
+            'nodeCapacity': index['nodeCapacity'],
+            'levels': len(index['levels']),
+            'regions': index['regions'],
+        }, f, ensure_ascii=False)
+
+
+def _contains(bboxes, x, y):
+    return (bboxes[:, 0] <= x) & (x <= bboxes[:, 2]) & (bboxes[:, 1] <= y) & (y <= bboxes[:, 3])
+
+
+class AdminBoundaries:
+    """
+    Offline admin-1 region lookup: an STR-packed R-tree over polygon bounding boxes,
+    followed by an even-odd point-in-polygon test on the candidate polygons.
+
+    Takes the output of build_admin_boundaries directly, or loads a saved index
+    with memory-mapped arrays via AdminBoundaries.load.
+    """
+
+    def __init__(self, index):
+        self.node_capacity = index['nodeCapacity']
+        self.regions = index['regions']
+        self.levels = index['levels']
+        self.polygon_regions = index['polygon_regions']
+        self.edge_offsets = index['edge_offsets']
+        self.edges = index['edges']
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        with open(directory / 'index.json', encoding='utf-8') as f:
+            header = json.load(f)
+        arrays = {
+            name: np.load(directory / f'{name}.npy', mmap_mode='r')
+            for name in ('polygon_regions', 'edge_offsets', 'edges')
+        }
+        levels = [np.load(directory / f'level_{i}.npy') for i in range(header['levels'])]
+        return cls({'nodeCapacity': header['nodeCapacity'], 'regions': header['regions'], 'levels': levels, **arrays})
+
+    def _candidates(self, x, y):
+        """
+        Indices of polygons whose bounding box contains the point.
+        """
+        nodes = np.flatnonzero(_contains(self.levels[-1], x, y))
+        for level in reversed(self.levels[:-1]):
+            children = (nodes[:, np.newaxis] * self.node_capacity + np.arange(self.node_capacity)).ravel()
+            children = children[children < len(level)]
+            nodes = children[_contains(level[children], x, y)]
+        return nodes
+
+    def _inside(self, polygon, x, y):
+        edges = self.edges[self.edge_offsets[polygon]:self.edge_offsets[polygon + 1]]
+        x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+        straddles = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        return np.count_nonzero(straddles & (x < crossing_x)) % 2 == 1
+
+    def resolve(self, latitude, longitude):
+        """
+        Find the admin-1 region containing a location.
+
+        Returns:
+            dict: The region's 'name', Winrock 'country' and 'subnationalUnit' and
+                'matchInfo', or None if no polygon contains the location
+        """
+        x, y = float(longitude), float(latitude)
+        for polygon in self._candidates(x, y):
+            if self._inside(polygon, x, y):
+                return self.regions[self.polygon_regions[polygon]]
+        return None
+
+    def resolve_many(self, latitudes, longitudes):
+        """
+        Resolve a list of locations.
+
+        Returns:
+            list: One region dict (or None) per location
+        """
+        return [self.resolve(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+
+
+def get_admin_boundaries():
+    """
+    Get the shared boundary index from ADMIN_BOUNDARIES_DIR (default data/admin_boundaries).
+
+    Returns:
+        AdminBoundaries: The index, or None if it has not been built
+    """
+    global _admin_boundaries, _admin_boundaries_loaded
+    if not _admin_boundaries_loaded:
+        with _admin_boundaries_lock:
+            if not _admin_boundaries_loaded:
+                directory = os.environ.get('ADMIN_BOUNDARIES_DIR', _DEFAULT_BOUNDARIES_DIR)
+                try:
+                    _admin_boundaries = AdminBoundaries.load(directory)
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"Admin boundaries not available: {str(e)}")
+                    _admin_boundaries = None
+                _admin_boundaries_loaded = True
+    return _admin_boundaries
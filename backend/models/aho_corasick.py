@@ -0,0 +1,56 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed list of patterns: finds which patterns
+    occur anywhere in a text in a single pass over the text.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+        # Empty patterns occur in every text
+        self._always = {i for i, pattern in enumerate(patterns) if not pattern}
+
+        for i, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                state = next_state
+            if pattern:
+                self._output[state].add(i)
+
+        # Breadth-first, so each fail state is complete before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def matches(self, text):
+        """
+        Returns:
+            set: Indices of the patterns occurring in text
+        """
+        found = set(self._always)
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._output[state]:
+                found |= self._output[state]
+        return found
@@ -0,0 +1,90 @@
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+# Parsed copy of reverse_geocoder's GeoNames city table, shared by all workers
+_DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'cache' / 'country_lookup'
+
+_country_lookup = None  # Module-level lookup instance
+_country_lookup_lock = threading.Lock()
+
+
+def _source_csv():
+    """
+    Path of the city table bundled with reverse_geocoder.
+    """
+    import reverse_geocoder
+    return Path(reverse_geocoder.__file__).parent / 'rg_cities1000.csv'
+
+
+def _build_arrays(source, cache_dir):
+    """
+    Parse the city table once into coordinates and country code arrays, written
+    atomically next to each other so concurrent workers never read a partial file.
+    """
+    import pandas as pd
+
+    # 'NA' is Namibia, not a missing value
+    cities = pd.read_csv(source, usecols=['lat', 'lon', 'cc'], dtype={'cc': str}, keep_default_na=False)
+    arrays = {
+        'coordinates': cities[['lat', 'lon']].to_numpy(dtype=np.float64),
+        'country_codes': cities['cc'].to_numpy(dtype='U2'),
+    }
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for name, values in arrays.items():
+        path = cache_dir / f'{name}.npy'
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+
+
+class CountryLookup:
+    """
+    Nearest-city country lookup over the reverse_geocoder city table, answered by a
+    single-process cKDTree. Gives the same answers as reverse_geocoder.search
+    (nearest city by plain lat/lon distance) without its multiprocessing mode.
+
+    The table is parsed once into .npy files that every worker memory-maps; each
+    worker then only builds the tree.
+    """
+
+    def __init__(self, cache_dir=_DEFAULT_CACHE_DIR, source=None):
+        from scipy.spatial import cKDTree
+
+        cache_dir = Path(cache_dir)
+        source = Path(source) if source else _source_csv()
+        coordinates_path = cache_dir / 'coordinates.npy'
+        if not coordinates_path.exists() or coordinates_path.stat().st_mtime < source.stat().st_mtime:
+            _build_arrays(source, cache_dir)
+
+        coordinates = np.load(coordinates_path, mmap_mode='r')
+        self.country_codes = np.load(cache_dir / 'country_codes.npy', mmap_mode='r')
+        self.tree = cKDTree(coordinates)
+
+    def iso_codes(self, latitudes, longitudes):
+        """
+        Look up the ISO 3166 alpha-2 country code of the nearest city for each coordinate.
+
+        Returns:
+            np.ndarray: Country codes, same shape as the inputs
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        points = np.column_stack([latitudes.ravel(), np.asarray(longitudes, dtype=float).ravel()])
+        _, indices = self.tree.query(points, k=1)
+        return np.asarray(self.country_codes[indices]).reshape(latitudes.shape)
+
+
+def get_country_lookup():
+    """
+    Get the shared country lookup, building it on first use
+    (COUNTRY_LOOKUP_CACHE_DIR overrides where the parsed table is kept).
+    """
+    global _country_lookup
+    if _country_lookup is None:
+        with _country_lookup_lock:
+            if _country_lookup is None:
+                _country_lookup = CountryLookup(os.environ.get('COUNTRY_LOOKUP_CACHE_DIR', _DEFAULT_CACHE_DIR))
+    return _country_lookup
@@ -0,0 +1,176 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from . import http_client
+from .kv_cache import SQLiteCache
+from .singleflight import SingleFlight
+
+GEOCODE_URL = 'https://geocode.maps.co/search'
+
+# Found addresses rarely move; misses are retried sooner in case the upstream data improves
+GEOCODE_CACHE_TTL_DAYS = float(os.environ.get('GEOCODE_CACHE_TTL_DAYS', 180))
+GEOCODE_NOT_FOUND_TTL_HOURS = float(os.environ.get('GEOCODE_NOT_FOUND_TTL_HOURS', 24))
+# Upstream errors are only remembered long enough to stop a burst of retries
+GEOCODE_ERROR_TTL_SECONDS = float(os.environ.get('GEOCODE_ERROR_TTL_SECONDS', 60))
+
+_DEFAULT_CACHE_PATH = Path(__file__).parent.parent / 'data' / 'cache' / 'forward_geocode.sqlite3'
+
+# Batches are spread over the same number of threads the HTTP layer allows per host
+_batch_executor = ThreadPoolExecutor(
+    max_workers=http_client.PER_HOST_LIMIT, thread_name_prefix='geocode'
+)
+# Coalesces concurrent lookups of the same normalized address
+_geocode_flight = SingleFlight()
+
+_geocode_cache = None  # Module-level cache instance
+_geocode_cache_lock = threading.Lock()
+
+
+class GeocodingError(ValueError):
+    """
+    An address could not be resolved to coordinates.
+    """
+
+
+class GeocodingUnavailableError(Exception):
+    """
+    The geocoding service failed or could not be reached; the address may be fine.
+    """
+
+
+def normalize_address(address):
+    """
+    Normalize an address for cache lookups: Unicode-normalized, case-folded,
+    with runs of whitespace and commas collapsed.
+
+    Returns:
+        str: The normalized address
+    """
+    address = unicodedata.normalize('NFKC', address).casefold()
+    address = re.sub(r'\s*,[\s,]*', ', ', address)
+    return re.sub(r'\s+', ' ', address).strip(' ,')
+
+
+def get_geocode_cache():
+    """
+    Get the persistent forward geocoding cache (GEOCODE_CACHE_PATH overrides its location).
+    """
+    global _geocode_cache
+    if _geocode_cache is None:
+        with _geocode_cache_lock:
+            if _geocode_cache is None:
+                _geocode_cache = SQLiteCache(
+                    os.environ.get('GEOCODE_CACHE_PATH', _DEFAULT_CACHE_PATH),
+                    ttl_seconds=GEOCODE_CACHE_TTL_DAYS * 24 * 3600,
+                )
+    return _geocode_cache
+
+
+def _fetch_coordinates(query):
+    """
+    Query geocode.maps.co for an address.
+
+    Returns:
+        dict: 'latitude' and 'longitude', or 'error' ('notFound' or 'upstream') with a 'message'
+    """
+    payload = {'q': query, 'api_key': os.environ.get('GEOCODE_MAPS_API_KEY')}
+    try:
+        r = http_client.get(GEOCODE_URL, params=payload)
+        r.raise_for_status()
+        results = r.json()
+    except Exception as e:
+        print(f"Error geocoding address: {str(e)}")
+        return {'error': 'upstream', 'message': 'Geocoding service unavailable'}
+
+    if not results:
+        return {'error': 'notFound', 'message': 'Address not found'}
+    return {'latitude': float(results[0]['lat']), 'longitude': float(results[0]['lon'])}
+
+
+def _is_fresh(entry):
+    """
+    Check a cached failure against its own, shorter lifetime. Successes use the cache TTL.
+    """
+    if 'error' not in entry:
+        return True
+    ttl = GEOCODE_NOT_FOUND_TTL_HOURS * 3600 if entry['error'] == 'notFound' else GEOCODE_ERROR_TTL_SECONDS
+    return time.time() - entry['cachedAt'] <= ttl
+
+
+def _lookup(key):
+    """
+    Resolve a normalized address through the cache, querying upstream on a miss.
+
+    Returns:
+        dict: The cache entry
+    """
+    cache = get_geocode_cache()
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry):
+        return entry
+
+    entry = dict(_fetch_coordinates(key), cachedAt=time.time())
+    cache.put(key, entry)
+    return entry
+
+
+def _resolve(address):
+    key = normalize_address(address)
+    if not key:
+        return {'error': 'notFound', 'message': 'Address is empty'}
+    return _geocode_flight.do(key, _lookup, key)
+
+
+def geocode_address(address):
+    """
+    Look up coordinates for an address with geocode.maps.co, through the persistent cache.
+
+    Returns:
+        tuple: (latitude, longitude)
+
+    Raises:
+        GeocodingError: If the address was not found
+        GeocodingUnavailableError: If the service failed (failures are cached briefly as well)
+    """
+    entry = _resolve(address)
+    if entry.get('error') == 'upstream':
+        raise GeocodingUnavailableError(entry['message'])
+    if 'error' in entry:
+        raise GeocodingError(entry['message'])
+    return entry['latitude'], entry['longitude']
+
+
+def geocode_addresses(addresses):
+    """
+    Look up coordinates for many addresses. Each distinct normalized address is
+    resolved once; cache misses are fetched concurrently within the per-host limit.
+
+    Returns:
+        list: One dict per address, with 'latitude' and 'longitude' or an 'error' message
+    """
+    keys = [normalize_address(address) for address in addresses]
+    unique_keys = list(dict.fromkeys(keys))
+    entries = dict(zip(unique_keys, _batch_executor.map(_resolve, unique_keys)))
+
+    results = []
+    for key in keys:
+        entry = entries[key]
+        if 'error' in entry:
+            results.append({'error': entry['message']})
+        else:
+            results.append({'latitude': entry['latitude'], 'longitude': entry['longitude']})
+    return results
+
+
+def get_geocode_stats():
+    """
+    Get forward geocoding cache and request coalescing statistics.
+    """
+    return {
+        'cache': get_geocode_cache().stats(),
+        'flight': _geocode_flight.stats(),
+    }
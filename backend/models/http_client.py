@@ -0,0 +1,126 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from geopy.adapters import RequestsAdapter
+
+# (connect, read) timeouts in seconds for every outbound call
+DEFAULT_TIMEOUT = (
+    float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5)),
+    float(os.environ.get('HTTP_READ_TIMEOUT', 60)),
+)
+MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))
+# Maximum number of simultaneous requests to a single host from this process
+PER_HOST_LIMIT = int(os.environ.get('HTTP_PER_HOST_LIMIT', 4))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_session = None  # Module-level shared session
+_session_lock = threading.Lock()
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_semaphore(url):
+    """
+    Get the semaphore limiting concurrent requests to the host of a URL.
+    """
+    host = urlsplit(url).netloc
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(PER_HOST_LIMIT)
+            _host_semaphores[host] = semaphore
+    return semaphore
+
+
+def _backoff_seconds(attempt, response=None):
+    """
+    Full-jitter exponential backoff, honouring a numeric Retry-After header if present.
+    """
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session that applies a default timeout, a per-host concurrency limit
+    and jittered retries on connection errors, timeouts and retryable status codes.
+    """
+
+    def __init__(self, max_retries=MAX_RETRIES):
+        super().__init__()
+        self.max_retries = max_retries
+        # Keep-alive pools sized to the per-host limit; retries are handled in request()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=PER_HOST_LIMIT, max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+        semaphore = _host_semaphore(url)
+
+        for attempt in range(self.max_retries + 1):
+            is_last_attempt = attempt == self.max_retries
+            try:
+                with semaphore:
+                    response = super().request(method, url, *args, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if is_last_attempt:
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or is_last_attempt:
+                    return response
+                response.close()
+
+            print(f"Retrying {method} {urlsplit(url).netloc} (attempt {attempt + 1} of {self.max_retries})")
+            time.sleep(_backoff_seconds(attempt, response))
+
+
+def get_session():
+    """
+    Get the process-wide pooled session used for all outbound HTTP calls.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession()
+    return _session
+
+
+def get(url, **kwargs):
+    """
+    Send a GET request through the shared pooled session.
+    """
+    return get_session().get(url, **kwargs)
+
+
+class SharedSessionAdapter(RequestsAdapter):
+    """
+    geopy adapter that sends geocoder requests through the shared pooled session,
+    e.g. Nominatim(user_agent=..., adapter_factory=SharedSessionAdapter).
+    """
+
+    def __init__(self, *, proxies, ssl_context):
+        # Skip RequestsAdapter.__init__, which would build a private session
+        super(RequestsAdapter, self).__init__(proxies=proxies, ssl_context=ssl_context)
+        self.session = get_session()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def __del__(self):
+        # The shared session outlives any one geocoder
+        pass
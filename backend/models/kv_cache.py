@@ -0,0 +1,76 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache of JSON-serializable values in a SQLite file.
+
+    Every thread gets its own connection, and the database runs in WAL mode, so
+    reads from any number of threads and worker processes do not block each other.
+    Entries older than `ttl_seconds` are treated as missing and replaced on the next put.
+    """
+
+    def __init__(self, path, ttl_seconds):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        """
+        Look up a value.
+
+        Returns:
+            The stored value, or None on a miss or expired entry
+        """
+        row = self._connection().execute(
+            'SELECT value, created FROM entries WHERE key = ?', (key,)
+        ).fetchone()
+        found = row is not None and time.time() - row[1] <= self.ttl_seconds
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return json.loads(row[0]) if found else None
+
+    def put(self, key, value):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (key, value, created) VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time()),
+            )
+
+    def stats(self):
+        """
+        Get hit/miss counters for this process and the number of stored entries.
+        """
+        entries = self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+                'entries': entries,
+            }
@@ -0,0 +1,125 @@
+import os
+import threading
+from .lru_cache import LRUCache
+from .solar_utils import get_country_name_for_emissions, get_emissions_factor
+from .weather_grid import snap_to_weather_grid
+
+# Locations whose facts are kept in memory
+LOCATION_CONTEXT_CACHE_SIZE = int(os.environ.get('LOCATION_CONTEXT_CACHE_SIZE', 4096))
+# Decimal places locations are rounded to before lookup (4 places is roughly 10 m)
+LOCATION_CONTEXT_PRECISION = int(os.environ.get('LOCATION_CONTEXT_PRECISION', 4))
+
+_location_contexts = LRUCache(LOCATION_CONTEXT_CACHE_SIZE)
+# Timezones of weather grid nodes, used for PVGIS downloads
+_cell_timezones = LRUCache(LOCATION_CONTEXT_CACHE_SIZE)
+
+_timezone_finder = None
+_timezone_finder_lock = threading.Lock()
+
+_UNSET = object()
+
+
+def timezone_at(latitude, longitude):
+    """
+    Look up the timezone name for a location with a shared TimezoneFinder.
+    It is only needed for PVGIS downloads and opens its data files on creation,
+    so it is imported and created on first use. Lookups read those files, so
+    they are serialized.
+    """
+    global _timezone_finder
+    with _timezone_finder_lock:
+        if _timezone_finder is None:
+            from timezonefinder import TimezoneFinder
+            _timezone_finder = TimezoneFinder()
+        return _timezone_finder.timezone_at(lat=latitude, lng=longitude)
+
+
+class LocationContext:
+    """
+    Location facts shared by every request for (nearly) the same point: the country
+    and grid emissions factor and the Winrock country/unit. They are looked up at
+    the point itself, not at its weather grid node, so clicks near a border or a
+    coast get the right answer. Each fact is looked up on first use, so solar
+    requests never pay for the Winrock lookup and vice versa.
+    """
+
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+        self._values = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _field(self, name, compute):
+        """
+        Compute a field once; concurrent first reads wait for the same computation.
+        If the computation raises, nothing is kept and the next read tries again.
+        """
+        value = self._values.get(name, _UNSET)
+        if value is not _UNSET:
+            return value
+        with self._lock:
+            field_lock = self._locks.setdefault(name, threading.Lock())
+        with field_lock:
+            value = self._values.get(name, _UNSET)
+            if value is _UNSET:
+                value = compute()
+                self._values[name] = value
+            return value
+
+    @property
+    def emissions_country(self):
+        """
+        Country name as it appears in the emissions data file, or None.
+        """
+        return self._field('emissionsCountry', lambda: get_country_name_for_emissions(self.latitude, self.longitude))
+
+    @property
+    def emissions_factor(self):
+        """
+        Grid emissions factor of the country (gCO2e/kWh), or None.
+        """
+        return self._field('emissionsFactor', lambda: get_emissions_factor(self.emissions_country))
+
+    @property
+    def winrock_unit(self):
+        """
+        Winrock (country, subnational_unit, match_info), or None outside Winrock
+        countries. A failed Nominatim call raises instead, so it is not kept.
+        """
+        from .reforestation_calculator import locate_winrock_unit
+        return self._field('winrockUnit', lambda: locate_winrock_unit(self.latitude, self.longitude))
+
+
+def get_location_context(latitude, longitude):
+    """
+    Get the shared location context of a location, rounded to LOCATION_CONTEXT_PRECISION decimals.
+
+    Returns:
+        LocationContext: Cached per rounded location, least recently used evicted first
+    """
+    key = (round(float(latitude), LOCATION_CONTEXT_PRECISION), round(float(longitude), LOCATION_CONTEXT_PRECISION))
+    return _location_contexts.get_or_compute(key, LocationContext, *key)
+
+
+def get_cell_timezone(latitude, longitude):
+    """
+    Get the timezone of the weather grid node a location snaps to, which is where
+    its weather is downloaded for.
+
+    Returns:
+        str: Timezone name, or None
+    """
+    cell = snap_to_weather_grid(latitude, longitude)
+    key = (cell['provider'], cell['latitude'], cell['longitude'])
+    return _cell_timezones.get_or_compute(key, timezone_at, cell['latitude'], cell['longitude'])
+
+
+def get_location_context_stats():
+    """
+    Get hit/miss counters of the location context and grid node timezone caches.
+    """
+    return {
+        'locations': _location_contexts.stats(),
+        'cellTimezones': _cell_timezones.stats(),
+    }
@@ -0,0 +1,78 @@
+import json
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Prebuilt by data/build_model_store.py
+_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+_model_store = None  # Module-level store instance
+_model_store_loaded = False
+_model_store_lock = threading.Lock()
+
+
+class _ModelTable:
+    """
+    One memory-mapped float64 matrix (one row per model) plus its name -> row index.
+    """
+
+    def __init__(self, path, parameters, names):
+        self.values = np.load(path, mmap_mode='r')
+        self.parameters = pd.Index(parameters)
+        self.rows = {name: row for row, name in enumerate(names)}
+
+    def get(self, name):
+        row = self.rows.get(name)
+        if row is None:
+            return None
+        return pd.Series(np.array(self.values[row], dtype=float), index=self.parameters, name=name)
+
+
+class ModelStore:
+    """
+    Compact Sandia panel and CEC inverter records holding only the parameters the
+    SAPM and Sandia inverter models read. Records are read from the memory-mapped
+    tables by name, so only the rows that are used are paged in.
+    """
+
+    def __init__(self, data_dir):
+        data_dir = Path(data_dir)
+        with open(data_dir / 'sam_models.json') as f:
+            index = json.load(f)
+        self.panels = _ModelTable(data_dir / 'sam_panels.npy', **index['panels'])
+        self.inverters = _ModelTable(data_dir / 'sam_inverters.npy', **index['inverters'])
+
+    def panel(self, name):
+        """
+        Returns:
+            pd.Series: Panel parameters, or None if the model is not in the store
+        """
+        return self.panels.get(name)
+
+    def inverter(self, name):
+        """
+        Returns:
+            pd.Series: Inverter parameters, or None if the model is not in the store
+        """
+        return self.inverters.get(name)
+
+
+def get_model_store():
+    """
+    Get the shared model store.
+
+    Returns:
+        ModelStore: The store, or None if it has not been built
+    """
+    global _model_store, _model_store_loaded
+    if not _model_store_loaded:
+        with _model_store_lock:
+            if not _model_store_loaded:
+                try:
+                    _model_store = ModelStore(_DATA_DIR)
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"Model store not available, using the full SAM databases: {str(e)}")
+                    _model_store = None
+                _model_store_loaded = True
+    return _model_store
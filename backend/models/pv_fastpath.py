@@ -0,0 +1,155 @@
+import numpy as np
+from scipy import constants
+import pvlib
+from .solar_calculator import compute_site_geometry, get_inverter_specs, get_panel_specs, get_site_geometry
+
+# Documented bound on the relative difference from simulate_pv_output's annual
+# totals. Measured on full-year runs over several sites, panels, inverters, tilts
+# and azimuths: ~4e-16 in float64 (rounding order only) and ~1.2e-7 in float32.
+FLOAT64_RTOL = 1e-12
+FLOAT32_RTOL = 1e-5
+
+_ALBEDO = 0.25  # pvlib.irradiance.get_total_irradiance default
+_TEMPERATURE_PARAMS = pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS["sapm"]["open_rack_glass_glass"]
+
+
+def _pv_chain(site_arrays, weather_arrays, array_tilt, orientation, panel, inverter, dtype):
+    """
+    Run haydavies transposition, SAPM effective irradiance, sapm_cell, SAPM and the
+    Sandia inverter on raw arrays, with the same formulas as pvlib 0.10.
+
+    Returns:
+        tuple: (p_mp, ac) hourly per-panel DC and AC power arrays (NaN at night, as in pvlib)
+    """
+    def c(value):
+        return dtype.type(value)
+
+    zenith, sun_azimuth, airmass, dni_extra = site_arrays
+    dni, ghi, dhi, temp_air, wind_speed = weather_arrays
+
+    cos_tilt = c(np.cos(np.radians(array_tilt)))
+    sin_tilt = c(np.sin(np.radians(array_tilt)))
+    zenith_rad = np.radians(zenith)
+    cos_zenith = np.cos(zenith_rad)
+
+    # Angle of incidence projection
+    projection = np.sin(zenith_rad)
+    projection *= sin_tilt
+    projection *= np.cos(np.radians(sun_azimuth - c(orientation)))
+    projection += cos_tilt * cos_zenith
+    np.clip(projection, -1, 1, out=projection)
+
+    # Hay & Davies sky diffuse plus isotropic ground reflection
+    rb = np.maximum(projection, 0) / np.maximum(cos_zenith, c(0.01745))
+    ai = dni / dni_extra
+    poa_diffuse = np.maximum(dhi * (1 - ai) * (c(0.5) * (1 + cos_tilt)), 0)
+    poa_diffuse += np.maximum(dhi * (ai * rb), 0)
+    poa_diffuse += ghi * c(_ALBEDO) * (1 - cos_tilt) * c(0.5)
+    # cos(aoi) is the clipped projection itself
+    poa_direct = np.maximum(dni * projection, 0)
+    poa_global = poa_direct + poa_diffuse
+    aoi = np.degrees(np.arccos(projection))
+
+    # SAPM spectral and incidence angle modifiers (Horner evaluation, as np.polyval)
+    spectral = np.full_like(airmass, c(panel['A4']))
+    for key in ('A3', 'A2', 'A1', 'A0'):
+        spectral *= airmass
+        spectral += c(panel[key])
+    spectral = np.maximum(0, np.where(np.isnan(spectral), 0, spectral))
+    iam = np.full_like(aoi, c(panel['B5']))
+    for key in ('B4', 'B3', 'B2', 'B1', 'B0'):
+        iam *= aoi
+        iam += c(panel[key])
+    np.maximum(iam, 0, out=iam)
+    ee = spectral * (poa_direct * iam + c(panel['FD']) * poa_diffuse)
+
+    # SAPM cell temperature
+    temp_cell = poa_global * np.exp(c(_TEMPERATURE_PARAMS['a']) + c(_TEMPERATURE_PARAMS['b']) * wind_speed)
+    temp_cell += temp_air
+    temp_cell += poa_global / c(1000) * c(_TEMPERATURE_PARAMS['deltaT'])
+
+    # SAPM DC
+    ee /= c(1000)
+    dtemp = temp_cell - c(25)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ee = np.where(ee > 0, np.log(np.where(ee > 0, ee, 1)), np.where(ee == 0, -np.inf, np.nan)).astype(dtype)
+        delta_log_ee = c(panel['N']) * c(constants.k / constants.e) * (temp_cell + c(273.15)) * log_ee
+        i_mp = c(panel['Impo']) * (c(panel['C0']) * ee + c(panel['C1']) * ee * ee) * (1 + c(panel['Aimp']) * dtemp)
+        cells_in_series = c(panel['Cells_in_Series'])
+        v_mp = (
+            c(panel['Vmpo'])
+            + c(panel['C2']) * cells_in_series * delta_log_ee
+            + c(panel['C3']) * cells_in_series * delta_log_ee * delta_log_ee
+            + (c(panel['Bvmpo']) + c(panel['Mbvmp']) * (1 - ee)) * dtemp
+        )
+        v_mp = np.maximum(0, v_mp)
+        p_mp = i_mp * v_mp
+
+        # Sandia inverter
+        dv = v_mp - c(inverter['Vdco'])
+        a = c(inverter['Pdco']) * (1 + c(inverter['C1']) * dv)
+        b = c(inverter['Pso']) * (1 + c(inverter['C2']) * dv)
+        curvature = c(inverter['C0']) * (1 + c(inverter['C3']) * dv)
+        p_less_b = p_mp - b
+        ac = (c(inverter['Paco']) / (a - b) - curvature * (a - b)) * p_less_b + curvature * p_less_b * p_less_b
+        ac = np.minimum(c(inverter['Paco']), ac)
+        ac[p_mp < c(inverter['Pso'])] = -abs(c(inverter['Pnt']))
+
+    return p_mp, ac
+
+
+def simulate_pv_totals(
+    solar_weather_timeseries,
+    latitude,
+    longitude,
+    altitude_meters,
+    array_tilt,
+    orientation,
+    pv_panel_model,
+    inverter_model,
+    number_of_panels,
+    use_float32=False,
+    memoize_site=True,
+    return_hourly=False,
+):
+    """
+    Fused NumPy alternative to simulate_pv_output that returns annual totals only.
+
+    Takes the same arguments and runs the same model chain, but on raw ndarrays
+    with no intermediate Series or results DataFrame. Solar position comes from
+    the memoized site stage. Annual totals match simulate_pv_output within
+    FLOAT64_RTOL, or FLOAT32_RTOL with use_float32=True (sums are still
+    accumulated in float64). With memoize_site=False the site stage is computed
+    without being cached, for one-off weather such as multi-year runs.
+    With return_hourly=True the hourly AC output of the whole array is returned too.
+
+    Returns:
+        dict: 'annual_dc_wh' and 'annual_ac_wh' for the whole array, plus
+            'hourly_ac_wh' (ndarray) if requested
+    """
+    panel = get_panel_specs(pv_panel_model)
+    inverter = get_inverter_specs(inverter_model)
+    dtype = np.dtype(np.float32 if use_float32 else np.float64)
+
+    site_stage = get_site_geometry if memoize_site else compute_site_geometry
+    site = site_stage(solar_weather_timeseries, latitude, longitude, altitude_meters)
+    site_arrays = (
+        site['solar_position']['apparent_zenith'].to_numpy(dtype=dtype),
+        site['solar_position']['azimuth'].to_numpy(dtype=dtype),
+        site['airmass'].to_numpy(dtype=dtype),
+        np.asarray(site['dni_extra'], dtype=dtype),
+    )
+    weather_arrays = tuple(
+        solar_weather_timeseries[column].to_numpy(dtype=dtype)
+        for column in ('dni', 'ghi', 'dhi', 'temp_air', 'wind_speed')
+    )
+
+    p_mp, ac = _pv_chain(site_arrays, weather_arrays, array_tilt, orientation, panel, inverter, dtype)
+
+    totals = {
+        'annual_dc_wh': float(np.nansum(p_mp, dtype=np.float64)) * number_of_panels,
+        'annual_ac_wh': float(np.nansum(ac, dtype=np.float64)) * number_of_panels,
+    }
+    if return_hourly:
+        totals['hourly_ac_wh'] = ac.astype(np.float64) * number_of_panels
+    return totals
@@ -0,0 +1,144 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+# Lower numbers are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` calls per second on average, with bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Block until a token is available, then take it.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class RateLimitedDispatcher:
+    """
+    Queue calls to a rate-limited upstream and run them on a single worker thread,
+    one token per call.
+
+    Calls are keyed: submitting a key that is already queued or running returns the
+    same Future instead of queueing a second call, and raises its priority if the
+    new request is more urgent. Queued calls run in priority order, oldest first.
+    """
+
+    def __init__(self, rate, burst=1, name='dispatcher'):
+        self.bucket = TokenBucket(rate, burst)
+        self.name = name
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self._queue = []  # (priority, sequence, key) heap; stale entries are skipped
+        self._pending = {}  # key -> [future, priority, fn, args] for queued and running calls
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def submit(self, key, fn, *args, priority=PRIORITY_INTERACTIVE):
+        """
+        Queue fn(*args) under key, unless a call for the key is already pending.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result of the (possibly shared) call
+        """
+        with self._condition:
+            self.submitted += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.deduplicated += 1
+                if priority < pending[1] and not pending[0].running():
+                    pending[1] = priority
+                    heapq.heappush(self._queue, (priority, next(self._sequence), key))
+                return pending[0]
+
+            future = Future()
+            self._pending[key] = [future, priority, fn, args]
+            heapq.heappush(self._queue, (priority, next(self._sequence), key))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+            self._condition.notify()
+            return future
+
+    def _next(self):
+        """
+        Wait for the most urgent queued call and mark it running.
+        """
+        with self._condition:
+            while True:
+                while not self._queue:
+                    self._condition.wait()
+                priority, _, key = heapq.heappop(self._queue)
+                pending = self._pending.get(key)
+                # Skip entries for calls already run or re-queued at a higher priority
+                if pending is None or pending[1] != priority or not pending[0].set_running_or_notify_cancel():
+                    continue
+                return key, pending
+
+    def _run(self):
+        while True:
+            key, (future, _, fn, args) = self._next()
+            self.bucket.acquire()
+            try:
+                result = fn(*args)
+            except Exception as e:
+                with self._condition:
+                    self.failed += 1
+                    del self._pending[key]
+                future.set_exception(e)
+            else:
+                with self._condition:
+                    self.completed += 1
+                    del self._pending[key]
+                future.set_result(result)
+
+    def stats(self):
+        """
+        Get queue depth and call counters, for sizing the rate and priorities.
+        """
+        with self._condition:
+            running = sum(1 for future, *_ in self._pending.values() if future.running())
+            return {
+                'queueDepth': len(self._pending) - running,
+                'running': running,
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'completed': self.completed,
+                'failed': self.failed,
+                'ratePerSecond': self.bucket.rate,
+                'tokensAvailable': self.bucket.available(),
+            }
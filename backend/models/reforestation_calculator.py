@@ -1,29 +1,105 @@
 from .util import Point
 from .reforestation_utils import get_subnational_unit, normalize_to_Winrock_country_name
+from .admin_boundaries import get_admin_boundaries
+from .http_client import SharedSessionAdapter
+from .location_context import get_location_context
+from .kv_cache import SQLiteCache
+from .rate_limiter import PRIORITY_INTERACTIVE, RateLimitedDispatcher
+from .winrock_store import AGGREGATE_FLAGS, STATISTICS, WinrockStore
+from .reforestation_projection import PLANTATION_TYPES, forest_results_sections, growth_weights, project_removals
+import asyncio
 import json
+import os
+import numpy as np
+import threading
 from pathlib import Path
 from geopy.geocoders import Nominatim
 #import time
 
 # Initialize Nominatim geocoder
-_nominatim = Nominatim(user_agent="landunlock")
+_nominatim = Nominatim(user_agent="landunlock", adapter_factory=SharedSessionAdapter)
+
+# Public Nominatim allows about one request per second; the limit applies per process
+_nominatim_dispatcher = RateLimitedDispatcher(
+    rate=float(os.environ.get('NOMINATIM_RATE_PER_SECOND', 1)), name='nominatim'
+)
+# Decimal places coordinates are rounded to before lookup (3 places is roughly 100 m)
+REVERSE_GEOCODE_PRECISION = int(os.environ.get('REVERSE_GEOCODE_PRECISION', 3))
+# Longest a request waits for its turn in the Nominatim queue
+REVERSE_GEOCODE_TIMEOUT = float(os.environ.get('REVERSE_GEOCODE_TIMEOUT', 30))
+
+_DEFAULT_ADDRESS_CACHE_PATH = Path(__file__).parent.parent / 'data' / 'cache' / 'reverse_geocode.sqlite3'
+_address_cache = None  # Module-level address cache instance
+_address_cache_lock = threading.Lock()
 
 # Cache for Winrock data
 _winrock_data = None
+_winrock_data_lock = threading.Lock()
+
+def get_address_cache():
+    """
+    Get the persistent reverse geocoding cache, creating it from environment settings if needed:
+    REVERSE_GEOCODE_CACHE_PATH and REVERSE_GEOCODE_CACHE_TTL_DAYS.
+    """
+    global _address_cache
+    if _address_cache is None:
+        with _address_cache_lock:
+            if _address_cache is None:
+                _address_cache = SQLiteCache(
+                    os.environ.get('REVERSE_GEOCODE_CACHE_PATH', _DEFAULT_ADDRESS_CACHE_PATH),
+                    ttl_seconds=float(os.environ.get('REVERSE_GEOCODE_CACHE_TTL_DAYS', 180)) * 24 * 3600,
+                )
+    return _address_cache
+
+def _nominatim_address(latitude, longitude):
+    result = _nominatim.reverse((latitude, longitude))
+    return result.raw.get('address') if result else None
+
+def reverse_geocode_address(latitude, longitude, priority=PRIORITY_INTERACTIVE):
+    """
+    Get the Nominatim address of a location, from the persistent cache when possible.
+    Misses go through the rate-limited Nominatim queue, where concurrent lookups of
+    the same rounded coordinates share one request. Locations without an address
+    (e.g. open sea) are cached too.
+
+    Returns:
+        dict: Nominatim address details, or None if the location has no address
+    """
+    latitude = round(float(latitude), REVERSE_GEOCODE_PRECISION)
+    longitude = round(float(longitude), REVERSE_GEOCODE_PRECISION)
+    key = f"{latitude:.{REVERSE_GEOCODE_PRECISION}f},{longitude:.{REVERSE_GEOCODE_PRECISION}f}"
+
+    cache = get_address_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached['address']
+
+    future = _nominatim_dispatcher.submit(key, _nominatim_address, latitude, longitude, priority=priority)
+    address = future.result(timeout=REVERSE_GEOCODE_TIMEOUT)
+    cache.put(key, {'address': address})
+    return address
+
+def get_reverse_geocode_stats():
+    """
+    Get reverse geocoding cache hit rate and Nominatim queue statistics.
+    """
+    return {
+        'cache': get_address_cache().stats(),
+        'queue': _nominatim_dispatcher.stats(),
+    }
 
 def get_location_info(latitude, longitude):
     """
     Get location information using Nominatim and Winrock data.
     Returns a tuple of (address dict, list of Winrock subnational units, country name).
+    Errors reaching Nominatim are raised rather than reported as a missing location.
     """
+    # Get location information from Nominatim
+    address = reverse_geocode_address(latitude, longitude)
+    if not address:
+        return None, None, None
+
     try:
-        # Get location information from Nominatim
-        result = _nominatim.reverse((latitude, longitude))
-        if not result or not result.raw.get('address'):
-            return None, None, None
-            
-        address = result.raw['address']
-        
         # Get country name and normalize it
         country = address.get('country')
         if not country:
@@ -57,7 +133,8 @@ def get_location_info(latitude, longitude):
 
 def get_winrock_data():
     """
-    Get the Winrock data from the JSON file.
+    Get the Winrock data, from the memory-mapped store built by
+    data/preprocess_Winrock_data.py, or from the JSON file if the store is missing.
     The data is structured as:
     {
         'country_name': {
@@ -76,171 +153,268 @@ def get_winrock_data():
     if _winrock_data is not None:
         return _winrock_data
     
-    # Get the path to the data file using relative paths
-    data_dir = Path(__file__).parent.parent / 'data'
-    input_file = data_dir / 'Winrock_data.json'
-    
-    # Read the JSON file
-    with open(input_file, 'r') as f:
-        _winrock_data = json.load(f)
+    with _winrock_data_lock:
+        if _winrock_data is None:
+            try:
+                _winrock_data = WinrockStore()
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Winrock store not available, reading Winrock_data.json: {str(e)}")
+                # Get the path to the data file using relative paths
+                data_dir = Path(__file__).parent.parent / 'data'
+                with open(data_dir / 'Winrock_data.json', 'r') as f:
+                    _winrock_data = json.load(f)
     
     return _winrock_data
 
-def get_country_median_values(winrock_data, country):
+FOREST_TYPES = [
+    'teak', 'eucalyptus', 'other broadleaf', 'oak', 'pine',
+    'other conifer', 'Natural Regeneration',
+    'Mangrove Restoration - tree', 'Mangrove Restoration - shrub',
+    'Agroforestry'
+]
+
+def get_country_median_values(winrock_data, country, statistic='median', flag=None):
     """
-    Calculate median values for all forest types across all subregions of a country.
+    Get median (or mean) values for all forest types across all subregions of a country.
+    The store holds them precomputed; plain JSON data is aggregated on the fly.
     
     Args:
-        winrock_data (dict): The Winrock data dictionary
+        winrock_data (dict): The Winrock data dictionary or store
         country (str): The country name
+        statistic (str): 'median' or 'mean'
+        flag (str): Only aggregate subregions with this flag set ('Coastal' or 'NatRegen')
         
     Returns:
-        dict: Dictionary containing median values for each forest type
+        dict: Dictionary containing the aggregate value for each forest type
     """
-    # Get all subregions for the country
-    subregions = winrock_data.get(country, {})
-    
-    # Initialize lists to store values for each forest type
-    forest_values = {
-        'teak': [], 'eucalyptus': [], 'other broadleaf': [], 'oak': [], 
-        'pine': [], 'other conifer': [], 'Natural Regeneration': [],
-        'Mangrove Restoration - tree': [], 'Mangrove Restoration - shrub': [],
-        'Agroforestry': []
-    }
-    
+    if statistic not in STATISTICS:
+        raise ValueError(f"statistic must be one of {', '.join(STATISTICS)}")
+    if flag is not None and flag not in AGGREGATE_FLAGS:
+        raise ValueError(f"flag must be one of {', '.join(AGGREGATE_FLAGS)}")
+    if country not in winrock_data:
+        return {forest_type: 'N/A' for forest_type in FOREST_TYPES}
+
+    if isinstance(winrock_data, WinrockStore):
+        aggregate = winrock_data.country_aggregate(country, statistic, flag)
+        return {forest_type: aggregate[forest_type] for forest_type in FOREST_TYPES}
+
     # Collect all non-N/A values for each forest type
-    for subregion in subregions.values():
-        for forest_type in forest_values.keys():
-            value = subregion.get(forest_type)
-            if value != 'N/A' and isinstance(value, (int, float)):
-                forest_values[forest_type].append(value)
-    
-    # Calculate median for each forest type
-    median_values = {}
-    for forest_type, values in forest_values.items():
-        if values:
-            median_values[forest_type] = sum(values) / len(values)
+    subregions = [
+        subregion for subregion in winrock_data[country].values()
+        if flag is None or subregion.get(flag) == 1
+    ]
+    aggregate_values = {}
+    for forest_type in FOREST_TYPES:
+        values = [
+            subregion[forest_type] for subregion in subregions
+            if isinstance(subregion.get(forest_type), (int, float))
+        ]
+        if not values:
+            aggregate_values[forest_type] = 'N/A'
         else:
-            median_values[forest_type] = 'N/A'
+            aggregate_values[forest_type] = float(np.median(values) if statistic == 'median' else np.mean(values))
     
-    return median_values
+    return aggregate_values
+
+def locate_winrock_unit(latitude, longitude):
+    """
+    Resolve a location to its Winrock country and subnational unit. The offline
+    admin-1 boundary index answers when it has been built and covers the location;
+    otherwise Nominatim reverse geocoding and name matching are used.
+
+    Returns:
+        tuple: (country, subnational_unit, match_info), with subnational_unit and
+            match_info None when no unit matched, or None if the location is not
+            in a Winrock country
+
+    Raises:
+        Exception: If Nominatim could not be reached, so the answer is unknown
+    """
+    boundaries = get_admin_boundaries()
+    region = boundaries.resolve(latitude, longitude) if boundaries is not None else None
+    if region is not None:
+        if not region['country']:
+            return None
+        return region['country'], region['subnationalUnit'], region['matchInfo']
+
+    address, country_units, country = get_location_info(latitude, longitude)
+    if not address or not country_units:
+        return None
+    subnational_unit, match_info = get_subnational_unit(address, country_units)
+    return country, subnational_unit, match_info
 
-def calculate_reforestation_impact(area_hectares, location):
+def _cached_winrock_unit(location):
+    """
+    locate_winrock_unit for a location, shared by all requests for the same rounded location.
+    A failed Nominatim lookup is reported as not found for this request only.
+    """
+    try:
+        return get_location_context(location.lat, location.long).winrock_unit
+    except Exception as e:
+        print(f"Error locating Winrock unit: {str(e)}")
+        return None
+
+def calculate_reforestation_impact(area_hectares, location, country_statistic='median', projection=None):
     """
     Calculate the carbon sequestration impact of reforestation at a given location.
     
     Args:
         area_hectares (float): Area in hectares
         location (Point): Location object containing lat/long coordinates
+        country_statistic (str): 'median' or 'mean' of the country's units, used when no unit matches
+        projection (dict): Horizon and growth curve, see parse_projection_options
         
     Returns:
         dict: Results including carbon sequestered per year for each forest type
     """
-    latitude = location.lat
-    longitude = location.long
-    
-    # Get location info and Winrock units
-    address, country_units, country = get_location_info(latitude, longitude)
-    if not address or not country_units:
+    # Get the Winrock country and subnational unit
+    located = _cached_winrock_unit(location)
+    if located is None:
         return "Winrock location info not found"
+
+    return _reforestation_results(area_hectares, *located, country_statistic, projection)
+
+async def calculate_reforestation_impact_async(area_hectares, location, country_statistic='median', projection=None):
+    """
+    Async version of calculate_reforestation_impact. The location is resolved
+    in a worker thread while the Winrock data is loaded in another.
     
-    # Get the Winrock subnational unit for the location
-    subnational_unit, match_info = get_subnational_unit(address, country_units)
-    
-    # Get Winrock data for the location
+    Args:
+        area_hectares (float): Area in hectares
+        location (Point): Location object containing lat/long coordinates
+        country_statistic (str): 'median' or 'mean' of the country's units, used when no unit matches
+        projection (dict): Horizon and growth curve, see parse_projection_options
+        
+    Returns:
+        dict: Results including carbon sequestered per year for each forest type
+    """
+    located, _ = await asyncio.gather(
+        asyncio.to_thread(_cached_winrock_unit, location),
+        asyncio.to_thread(get_winrock_data),
+    )
+    if located is None:
+        return "Winrock location info not found"
+
+    return await asyncio.to_thread(_reforestation_results, area_hectares, *located, country_statistic, projection)
+
+def _sequestration_rates(country, subnational_unit, match_info, country_statistic='median'):
+    """
+    Get the Winrock rates for a resolved location, falling back to the country's
+    median (or mean) values if no subnational unit was matched.
+
+    Returns:
+        tuple: (subnational unit or country aggregate label, rates dict)
+    """
     winrock_data = get_winrock_data()
-    
-    # If no subnational unit was matched, use country median values
     if not subnational_unit or match_info == 'no_match':
-        sequestration_data = get_country_median_values(winrock_data, country)
-        subnational_unit = "Country Median"
-    else:
-        sequestration_data = winrock_data[country][subnational_unit]
-    
-    # Forest types to process (excluding averages and flags)
-    forest_types = [
-        'teak', 'eucalyptus', 'other broadleaf', 'oak', 'pine', 
-        'other conifer', 'Natural Regeneration', 
-        'Mangrove Restoration - tree', 'Mangrove Restoration - shrub', 
-        'Agroforestry'
+        return (
+            f"Country {country_statistic.capitalize()}",
+            get_country_median_values(winrock_data, country, country_statistic),
+        )
+    return subnational_unit, winrock_data[country][subnational_unit]
+
+def _rate_vector(sequestration_data):
+    """
+    Winrock rates of FOREST_TYPES as floats, NaN for N/A.
+    """
+    return [
+        value if isinstance(value, (int, float)) else np.nan
+        for value in (sequestration_data[forest_type] for forest_type in FOREST_TYPES)
     ]
+
+def _reforestation_results(area_hectares, country, subnational_unit, match_info, country_statistic='median', projection=None):
+    """
+    Calculate sequestration results once the location has been resolved.
     
-    # Calculate carbon sequestration for each forest type
-    forest_results = {}
-    for forest_type in forest_types:
-        print(f"\nDebug - Processing forest type: {forest_type}")
-        tC_ha_y = sequestration_data[forest_type]
-        print(f"Debug - tC_ha_y: {tC_ha_y}")
-        
-        # Skip if N/A
-        if tC_ha_y == 'N/A':
-            print(f"Debug - Skipping {forest_type} due to N/A value")
-            forest_results[forest_type] = {
-                'potential_removal_one_year_tCO2e': 'N/A',
-                'cumulative_removal_tCO2e': ['N/A'] * 20
-                #'average_20year_cumulative_removal_per_year_tCO2e': 'N/A'
-            }
-            continue
-            
-        # Calculate potential removal per year
-        potential_removal_one_year_tCO2e = area_hectares * tC_ha_y * 44/12 # multiply by the ratio of the molecular weight of carbon dioxide to that of carbon (44/12)
-        print(f"Debug - potential_removal_one_year_tCO2e: {potential_removal_one_year_tCO2e}")
-        
-        # Calculate cumulative removal over 20 years
-        cumulative_removal_tCO2e = []
-        for year in range(1, 21):
-            print(f"Debug - Processing year {year}")
-            if year == 1:
-                print(f"Debug - Year 1: Adding {potential_removal_one_year_tCO2e}")
-                cumulative_removal_tCO2e.append(potential_removal_one_year_tCO2e)
-            else:
-                print(f"Debug - Year {year}: Adding {cumulative_removal_tCO2e[year-2]} + {potential_removal_one_year_tCO2e}")
-                cumulative_removal_tCO2e.append(cumulative_removal_tCO2e[year-2] + potential_removal_one_year_tCO2e)
-        
-        # Calculate average yearly removal over 20 years
-        #average_20year_cumulative_removal_per_year_tCO2e = sum(cumulative_removal_tCO2e) / 20
-        # print(f"Debug - Average yearly removal: {average_20year_cumulative_removal_per_year_tCO2e}")
-        
-        forest_results[forest_type] = {
-            'potential_removal_one_year_tCO2e': potential_removal_one_year_tCO2e,
-            'cumulative_removal_tCO2e': cumulative_removal_tCO2e 
-            #'average_20year_cumulative_removal_per_year_tCO2e': average_20year_cumulative_removal_per_year_tCO2e
-        }
-    
-    # Restructure the results into categories
-    plantation_types = ['teak', 'eucalyptus', 'other broadleaf', 'oak', 'pine', 'other conifer']
-    print("\nDebug - forest_results contents:")
-    for k, v in forest_results.items():
-        print(f"{k}: {v}")
+    Args:
+        area_hectares (float): Area in hectares
+        country (str): Winrock country name
+        subnational_unit (str): Winrock subnational unit, or None to use country aggregates
+        match_info (dict): How the subnational unit was matched
+        country_statistic (str): 'median' or 'mean', for the country aggregates
+        projection (dict): Horizon and growth curve, see parse_projection_options
+            (default: constant removals over 20 years)
         
-    restructured_results = {
-        'Plantations and Woodlots': {
-            k: {key: [round(x, 1) if x != 'N/A' else 'N/A' for x in value] if isinstance(value, list) else (round(value, 1) if value != 'N/A' else 'N/A')
-                for key, value in v.items()} 
-            for k, v in forest_results.items() if k in plantation_types
-        },
-        'Other Forest Types': {
-            k: {key: [round(x, 1) if x != 'N/A' else 'N/A' for x in value] if isinstance(value, list) else (round(value, 1) if value != 'N/A' else 'N/A')
-                for key, value in v.items()} 
-            for k, v in forest_results.items() if k not in plantation_types
-        }
-    }
-    
-    print("\nDebug - restructured_results contents:")
-    for category, results in restructured_results.items():
-        print(f"\n{category}:")
-        for k, v in results.items():
-            print(f"{k}: {v}")
-    
-    return {
+    Returns:
+        dict: Results including carbon sequestered per year for each forest type
+    """
+    subnational_unit, sequestration_data = _sequestration_rates(
+        country, subnational_unit, match_info, country_statistic
+    )
+    removals = project_removals(_rate_vector(sequestration_data), area_hectares, growth_weights(projection))
+
+    result = {
         'landUseType': 'reforestation',
         'areaHectares': area_hectares,
         'country': country,
         'subnationalUnit': subnational_unit,
         'matchInfo': match_info,
         'tC_perHectare_perYear': sequestration_data,
-        'forestResults': restructured_results
+        'forestResults': forest_results_sections(removals, 0, FOREST_TYPES, include_annual=projection is not None)
     }
+    if projection is not None:
+        result['projection'] = projection
+    return result
+
+async def calculate_reforestation_portfolio(sites, country_statistic='median', projection=None):
+    """
+    Calculate reforestation results for many sites in one projection. Locations
+    are resolved concurrently (each rounded location once), then every site,
+    forest type and year is computed in a single array operation.
+
+    Args:
+        sites (list): Dicts with 'location' (Point) and 'areaHectares'
+        country_statistic (str): 'median' or 'mean', for sites without a matched unit
+        projection (dict): Horizon and growth curve, see parse_projection_options
+
+    Returns:
+        dict: 'sites' with one result per site (or an 'error'), and portfolio
+            'totals' per forest type over the sites that have a rate for it
+    """
+    located_sites = await asyncio.gather(
+        *(asyncio.to_thread(_cached_winrock_unit, site['location']) for site in sites)
+    )
+
+    results = [None] * len(sites)
+    resolved = []  # (site index, country, unit label, rates dict, match info)
+    for i, located in enumerate(located_sites):
+        if located is None:
+            results[i] = {'error': "Winrock location info not found"}
+            continue
+        country, subnational_unit, match_info = located
+        unit_label, sequestration_data = _sequestration_rates(country, subnational_unit, match_info, country_statistic)
+        resolved.append((i, country, unit_label, sequestration_data, match_info))
+
+    include_annual = projection is not None
+    totals = {}
+    if resolved:
+        rates = np.array([_rate_vector(sequestration_data) for _, _, _, sequestration_data, _ in resolved])
+        areas = np.array([sites[i]['areaHectares'] for i, *_ in resolved])
+        removals = project_removals(rates, areas, growth_weights(projection))
+
+        for row, (i, country, unit_label, sequestration_data, match_info) in enumerate(resolved):
+            results[i] = {
+                'landUseType': 'reforestation',
+                'areaHectares': sites[i]['areaHectares'],
+                'country': country,
+                'subnationalUnit': unit_label,
+                'matchInfo': match_info,
+                'tC_perHectare_perYear': sequestration_data,
+                'forestResults': forest_results_sections(removals, row, FOREST_TYPES, include_annual)
+            }
+
+        # Sum over sites, leaving out those without a rate for the forest type
+        has_rate = ~np.isnan(rates)
+        portfolio = {key: np.nansum(values, axis=0)[np.newaxis] for key, values in removals.items()}
+        totals = forest_results_sections(portfolio, 0, FOREST_TYPES, include_annual)
+        for j, forest_type in enumerate(FOREST_TYPES):
+            category = 'Plantations and Woodlots' if forest_type in PLANTATION_TYPES else 'Other Forest Types'
+            totals[category][forest_type]['sitesWithData'] = int(has_rate[:, j].sum())
+
+    response = {'sites': results, 'totals': totals}
+    if projection is not None:
+        response['projection'] = projection
+    return response
 
 def test_one_location():
     """
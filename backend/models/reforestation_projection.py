@@ -0,0 +1,134 @@
+import numpy as np
+
+DEFAULT_HORIZON_YEARS = 20
+MAX_HORIZON_YEARS = 100
+# Winrock rates are averages over the first 20 years of growth
+RATE_PERIOD_YEARS = 20
+GROWTH_CURVES = ('linear', 'sigmoid', 'saturation')
+DEFAULT_SIGMOID_MIDPOINT_YEAR = 10
+DEFAULT_SIGMOID_STEEPNESS = 0.5
+DEFAULT_SATURATION_TIME_CONSTANT_YEARS = 10
+
+PLANTATION_TYPES = ['teak', 'eucalyptus', 'other broadleaf', 'oak', 'pine', 'other conifer']
+
+
+def _positive_number(options, key, default):
+    value = options.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{key} must be a positive number")
+    return float(value)
+
+
+def parse_projection_options(options):
+    """
+    Validate the 'projection' request options: 'horizonYears' (default 20) and
+    'growthCurve', one of 'linear' (default, constant annual removals), 'sigmoid'
+    (slow start, with 'midpointYear' and 'steepness') or 'saturation' (fast start
+    levelling off, with 'timeConstantYears').
+
+    Returns:
+        dict: Normalized options, or None if no projection options were given
+    """
+    if not options:
+        return None
+    if not isinstance(options, dict):
+        raise ValueError("projection must be an object")
+
+    horizon_years = options.get('horizonYears', DEFAULT_HORIZON_YEARS)
+    if isinstance(horizon_years, bool) or not isinstance(horizon_years, int) or not 1 <= horizon_years <= MAX_HORIZON_YEARS:
+        raise ValueError(f"horizonYears must be an integer from 1 to {MAX_HORIZON_YEARS}")
+    growth_curve = options.get('growthCurve', 'linear')
+    if growth_curve not in GROWTH_CURVES:
+        raise ValueError(f"growthCurve must be one of {', '.join(GROWTH_CURVES)}")
+
+    parsed = {'horizonYears': horizon_years, 'growthCurve': growth_curve}
+    if growth_curve == 'sigmoid':
+        parsed['midpointYear'] = _positive_number(options, 'midpointYear', DEFAULT_SIGMOID_MIDPOINT_YEAR)
+        parsed['steepness'] = _positive_number(options, 'steepness', DEFAULT_SIGMOID_STEEPNESS)
+    elif growth_curve == 'saturation':
+        parsed['timeConstantYears'] = _positive_number(
+            options, 'timeConstantYears', DEFAULT_SATURATION_TIME_CONSTANT_YEARS
+        )
+    return parsed
+
+
+def growth_weights(options=None):
+    """
+    Multiplier of the Winrock annual rate for each year of the horizon. The curves
+    are scaled so their first 20 years average 1, i.e. every curve removes the
+    same carbon as the linear one by year 20 and only the timing differs.
+
+    Returns:
+        np.ndarray: Shape (horizon_years,)
+    """
+    options = options or {'horizonYears': DEFAULT_HORIZON_YEARS, 'growthCurve': 'linear'}
+    years = max(options['horizonYears'], RATE_PERIOD_YEARS)
+    if options['growthCurve'] == 'linear':
+        return np.ones(options['horizonYears'])
+
+    # Annual increments of the cumulative growth curve, for years 1..years
+    t = np.arange(years + 1)
+    if options['growthCurve'] == 'sigmoid':
+        cumulative = 1 / (1 + np.exp(-options['steepness'] * (t - options['midpointYear'])))
+    else:
+        cumulative = 1 - np.exp(-t / options['timeConstantYears'])
+    increments = np.diff(cumulative)
+    weights = increments * RATE_PERIOD_YEARS / increments[:RATE_PERIOD_YEARS].sum()
+    return weights[:options['horizonYears']]
+
+
+def project_removals(rates_tC_ha_y, areas_hectares, weights):
+    """
+    Project CO2 removals for every site, forest type and year at once.
+
+    Args:
+        rates_tC_ha_y (array): Winrock rates, shape (forest types,) for rates shared
+            by all sites or (sites, forest types); NaN where not available
+        areas_hectares (float or array): Area of each site
+        weights (array): Annual rate multipliers, from growth_weights
+
+    Returns:
+        dict: 'rateTCO2e' (sites, forest types) steady annual removal, and
+            'annualRemoval' and 'cumulativeRemoval' (sites, forest types, years), all tCO2e
+    """
+    rates = np.atleast_2d(np.asarray(rates_tC_ha_y, dtype=float))
+    areas = np.atleast_1d(np.asarray(areas_hectares, dtype=float))
+    # tC to tCO2e: multiply by the ratio of the molecular weight of carbon dioxide to that of carbon (44/12)
+    rate_tCO2e = areas[:, np.newaxis] * rates * 44 / 12
+    annual = rate_tCO2e[..., np.newaxis] * np.asarray(weights, dtype=float)
+    return {
+        'rateTCO2e': rate_tCO2e,
+        'annualRemoval': annual,
+        'cumulativeRemoval': np.cumsum(annual, axis=-1),
+    }
+
+
+def _rounded(values):
+    """
+    Round to one decimal, with 'N/A' for missing values. Uses Python's round, which
+    rounds the exact decimal value; np.round scales by 10 first and differs on ties.
+    """
+    if np.ndim(values) == 0:
+        return 'N/A' if np.isnan(values) else round(float(values), 1)
+    return ['N/A' if np.isnan(value) else round(value, 1) for value in np.asarray(values).tolist()]
+
+
+def forest_results_sections(projection, site, forest_types, include_annual=False):
+    """
+    Build the 'forestResults' response section of one site, grouped into
+    plantations and other forest types.
+
+    Returns:
+        dict: Forest type results per category
+    """
+    sections = {'Plantations and Woodlots': {}, 'Other Forest Types': {}}
+    for i, forest_type in enumerate(forest_types):
+        result = {
+            'potential_removal_one_year_tCO2e': _rounded(projection['rateTCO2e'][site, i]),
+            'cumulative_removal_tCO2e': _rounded(projection['cumulativeRemoval'][site, i]),
+        }
+        if include_annual:
+            result['annual_removal_tCO2e'] = _rounded(projection['annualRemoval'][site, i])
+        category = 'Plantations and Woodlots' if forest_type in PLANTATION_TYPES else 'Other Forest Types'
+        sections[category][forest_type] = result
+    return sections
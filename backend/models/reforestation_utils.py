@@ -2,12 +2,20 @@
 from geopy.geocoders import Nominatim
 #from geopy.exc import GeocoderTimedOut
 import re
+import bisect
+import functools
 import pycountry
 #import time
 from unidecode import unidecode
+from .aho_corasick import AhoCorasick
+from .http_client import SharedSessionAdapter
+from .lru_cache import LRUCache
 
 #_winrock_data = None  # Module-level cache for Winrock data
-_nominatim = Nominatim(user_agent="landunlock")  # Initialize Nominatim instance
+_nominatim = Nominatim(user_agent="landunlock", adapter_factory=SharedSessionAdapter)  # Initialize Nominatim instance
+
+# One match index per country unit list; there are fewer Winrock countries than entries
+_unit_indexes = LRUCache(256)
 
 
 
@@ -96,16 +104,28 @@ def get_nominatim_subdivisions(address):
     
     for key in subdivision_keys:
         if key in address:
-            value = address[key]
-            # Convert Chinese characters to Pinyin if present
-            from pypinyin import pinyin, Style
-            pinyin_result = pinyin(value, style=Style.TONE)
-            if pinyin_result:
-                value = ''.join([item[0] for item in pinyin_result])
-            subdivisions.append(value)
+            subdivisions.append(_to_pinyin(address[key]))
             
     return subdivisions
 
+@functools.lru_cache(maxsize=4096)
+def _to_pinyin(value):
+    """
+    Convert Chinese characters in a name to Pinyin (other characters are kept).
+    """
+    from pypinyin import pinyin, Style
+    pinyin_result = pinyin(value, style=Style.TONE)
+    if pinyin_result:
+        value = ''.join([item[0] for item in pinyin_result])
+    return value
+
+@functools.lru_cache(maxsize=16384)
+def _normalize_name(name):
+    """
+    ASCII-transliterated, lowercased name used by the normalized and substring matches.
+    """
+    return unidecode(name).lower()
+
 def get_iso_subdivisions(address):
     """
     Get all ISO3166-2 subdivision codes from Nominatim address details.
@@ -152,6 +172,83 @@ def get_iso_subdivisions(address):
 #     
 #     return name
 
+class SubnationalUnitIndex:
+    """
+    Match index over one country's Winrock units, built once per unit list:
+    dictionaries for the exact and exact_normalized matches, an Aho-Corasick
+    automaton for units contained in a name, and the joined normalized unit names
+    for names contained in a unit.
+    """
+
+    def __init__(self, winrock_units):
+        self.units = list(winrock_units)
+        normalized = [_normalize_name(unit) for unit in self.units]
+
+        # Lowercased name -> first unit with that name
+        self.exact = {}
+        for unit in self.units:
+            self.exact.setdefault(unit.lower(), unit)
+        # Normalized name -> all units with that normalized name
+        self.normalized = {}
+        for unit, name in zip(self.units, normalized):
+            self.normalized.setdefault(name, []).append(unit)
+
+        self.automaton = AhoCorasick(normalized)
+        # Normalized names joined by a separator no name contains, with each name's start offset
+        self.joined = '\0'.join(normalized)
+        self.starts = []
+        offset = 0
+        for name in normalized:
+            self.starts.append(offset)
+            offset += len(name) + 1
+
+    def _units_containing(self, name):
+        """
+        Indices of the units whose normalized name contains name.
+        """
+        if not name:
+            return set(range(len(self.units)))
+        found = set()
+        position = self.joined.find(name)
+        while position != -1:
+            found.add(bisect.bisect_right(self.starts, position) - 1)
+            position = self.joined.find(name, position + 1)
+        return found
+
+    def match(self, subdivision_name):
+        """
+        Same semantics as match_subnational_unit.
+
+        Returns:
+            tuple: (matched_unit, match_type), or (None, None)
+        """
+        # Try exact match first (case-insensitive)
+        unit = self.exact.get(subdivision_name.lower())
+        if unit is not None:  # For exact matches, take the first one even if multiple
+            return unit, 'exact'
+
+        # Try exact match after normalizing (converting to ASCII)
+        normalized_name = _normalize_name(subdivision_name)
+        normalized_matches = self.normalized.get(normalized_name, [])
+        if len(normalized_matches) == 1:  # For normalized matches, require exactly one match
+            return normalized_matches[0], 'exact_normalized'
+        elif len(normalized_matches) > 1:
+            return None, None  # Multiple normalized matches, skip to next subdivision
+
+        # Try substring matching after normalizing, in both directions
+        substring_matches = self._units_containing(normalized_name) | self.automaton.matches(normalized_name)
+        if len(substring_matches) == 1:  # For substring matches, require exactly one match
+            return self.units[substring_matches.pop()], 'substring'
+
+        return None, None  # No matches, or multiple substring matches
+
+def get_unit_index(winrock_units):
+    """
+    Get the match index for a list of Winrock units, building it on first use.
+    """
+    units = tuple(winrock_units)
+    return _unit_indexes.get_or_compute(units, SubnationalUnitIndex, units)
+
 def match_subnational_unit(subdivision_name, winrock_units):
     """
     Try to match a subdivision name against Winrock units, trying each match type
@@ -166,31 +263,7 @@ def match_subnational_unit(subdivision_name, winrock_units):
             - matched_unit (str): The original Winrock unit name with exact case, or None
             - match_type (str): 'exact', 'exact_normalized', or 'substring', or None
     """
-    # Try exact match first (case-insensitive)
-    exact_matches = [unit for unit in winrock_units 
-                    if unit.lower() == subdivision_name.lower()]
-    if exact_matches:  # For exact matches, take the first one even if multiple
-        return exact_matches[0], 'exact'
-    
-    # Try exact match after normalizing (converting to ASCII)
-    normalized_name = unidecode(subdivision_name)
-    normalized_matches = [unit for unit in winrock_units 
-                         if unidecode(unit).lower() == normalized_name.lower()]
-    if len(normalized_matches) == 1:  # For normalized matches, require exactly one match
-        return normalized_matches[0], 'exact_normalized'
-    elif len(normalized_matches) > 1:
-        return None, None  # Multiple normalized matches, skip to next subdivision
-    
-    # Try substring matching after normalizing, in both directions
-    substring_matches = [unit for unit in winrock_units 
-                        if normalized_name.lower() in unidecode(unit).lower() or 
-                           unidecode(unit).lower() in normalized_name.lower()]
-    if len(substring_matches) == 1:  # For substring matches, require exactly one match
-        return substring_matches[0], 'substring'
-    elif len(substring_matches) > 1:
-        return None, None  # Multiple substring matches, skip to next subdivision
-    
-    return None, None  # No matches found
+    return get_unit_index(winrock_units).match(subdivision_name)
 
 
 
@@ -233,9 +306,10 @@ def get_subnational_unit(address, country_units):
     print(f"Debug - Found {len(subdivisions)} total subdivisions to try")
     
     # Try matching each subdivision against the country's units
+    unit_index = get_unit_index(country_units)
     for subdivision_name, source, level in subdivisions:
         print(f"Debug - Trying {source} subdivision: {subdivision_name}")
-        matched_unit, match_type = match_subnational_unit(subdivision_name, country_units)
+        matched_unit, match_type = unit_index.match(subdivision_name)
         if matched_unit:
             return matched_unit, {
                 'source': source,
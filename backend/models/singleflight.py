@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still in flight wait for that call and get the same result (or exception).
+    Nothing is kept once the call finishes, so this only deduplicates
+    overlapping requests and is not a cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless a call for the same key is already running.
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+                is_leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.calls += 1
+                is_leader = True
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        """
+        Get the number of upstream calls made and calls served by a shared result.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'shared': self.shared,
+                'inFlight': len(self._in_flight),
+            }
@@ -0,0 +1,281 @@
+import numpy as np
+import pvlib
+from .solar_calculator import (
+    count_panels,
+    get_inverter_specs,
+    get_panel_specs,
+    get_site_geometry,
+    get_solar_weather_data,
+    orientation_to_degrees,
+    resolve_emissions_factor,
+)
+from .solar_lifetime import lifetime_sections, parse_lifetime_options
+from .weather_grid import PROVIDER_NAMES, snap_to_weather_grid
+
+DEFAULT_PANEL_MODEL = "Canadian_Solar_CS5P_220M___2009_"
+DEFAULT_INVERTER_MODEL = "ABB__MICRO_0_25_I_OUTD_US_208__208V_"
+
+# Number of distinct tilt/azimuth pairs evaluated together; bounds peak memory
+# to roughly 20 arrays of (chunk size x 8760) floats
+GEOMETRY_CHUNK_SIZE = 64
+
+
+def simulate_pv_configurations(
+    solar_weather_timeseries,
+    latitude,
+    longitude,
+    altitude_meters,
+    configurations,
+    chunk_size=GEOMETRY_CHUNK_SIZE,
+):
+    """
+    Simulate many PV configurations for one site in vectorized passes.
+
+    Runs the same pvlib model chain as simulate_pv_output, but on 2D arrays of
+    shape (configurations, hours). Solar position is computed once per site;
+    irradiance and cell temperature once per distinct tilt/azimuth; DC output
+    once per distinct geometry and panel model; AC output once per inverter model
+    over all rows that use it.
+
+    Args:
+        solar_weather_timeseries (pd.DataFrame): Hourly weather data
+        latitude (float), longitude (float), altitude_meters (float): Site
+        configurations (list): Dicts with 'array_tilt', 'azimuth' (degrees),
+            'pv_panel_model' and 'inverter_model'
+
+    Returns:
+        tuple: (annual_dc_wh, annual_ac_wh) arrays with the annual energy of a
+            single panel for each configuration
+    """
+    site = get_site_geometry(solar_weather_timeseries, latitude, longitude, altitude_meters)
+    solar_position = site['solar_position']
+
+    # Hourly inputs as (1, hours) rows that broadcast against (geometries, 1) columns
+    def row(series):
+        return series.to_numpy(dtype=float)[np.newaxis, :]
+
+    zenith = row(solar_position['apparent_zenith'])
+    sun_azimuth = row(solar_position['azimuth'])
+    airmass = row(site['airmass'])
+    dni_extra = row(site['dni_extra'])
+    dni = row(solar_weather_timeseries['dni'])
+    ghi = row(solar_weather_timeseries['ghi'])
+    dhi = row(solar_weather_timeseries['dhi'])
+    temp_air = row(solar_weather_timeseries['temp_air'])
+    wind_speed = row(solar_weather_timeseries['wind_speed'])
+    temperature_params = pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS["sapm"]["open_rack_glass_glass"]
+
+    # Distinct geometries, and which one each configuration uses
+    geometries = sorted({(float(c['array_tilt']), float(c['azimuth'])) for c in configurations})
+    geometry_index = {geometry: i for i, geometry in enumerate(geometries)}
+    config_geometry = np.array(
+        [geometry_index[(float(c['array_tilt']), float(c['azimuth']))] for c in configurations], dtype=int
+    )
+
+    annual_dc_wh = np.zeros(len(configurations))
+    annual_ac_wh = np.zeros(len(configurations))
+
+    for chunk_start in range(0, len(geometries), chunk_size):
+        chunk = geometries[chunk_start:chunk_start + chunk_size]
+        tilt = np.array([g[0] for g in chunk])[:, np.newaxis]
+        azimuth = np.array([g[1] for g in chunk])[:, np.newaxis]
+
+        total_irradiance = pvlib.irradiance.get_total_irradiance(
+            tilt, azimuth, zenith, sun_azimuth, dni, ghi, dhi,
+            dni_extra=dni_extra,
+            model="haydavies",
+        )
+        aoi = pvlib.irradiance.aoi(tilt, azimuth, zenith, sun_azimuth)
+        # The temperature model is the same for every panel, so do it once per geometry
+        cell_temperature = pvlib.temperature.sapm_cell(
+            total_irradiance["poa_global"], temp_air, wind_speed, **temperature_params
+        )
+
+        in_chunk = np.flatnonzero(
+            (config_geometry >= chunk_start) & (config_geometry < chunk_start + len(chunk))
+        )
+        panel_groups = {}
+        for i in in_chunk:
+            panel_groups.setdefault(configurations[i]['pv_panel_model'], []).append(i)
+
+        for pv_panel_model, config_ids in panel_groups.items():
+            panel_specs = get_panel_specs(pv_panel_model)
+            config_ids = np.array(config_ids)
+            # Geometry rows this panel needs, and each configuration's position in them
+            rows, row_of_config = np.unique(config_geometry[config_ids] - chunk_start, return_inverse=True)
+
+            effective_irradiance = pvlib.pvsystem.sapm_effective_irradiance(
+                total_irradiance["poa_direct"][rows],
+                total_irradiance["poa_diffuse"][rows],
+                airmass,
+                aoi[rows],
+                panel_specs,
+            )
+            dc_output = pvlib.pvsystem.sapm(effective_irradiance, cell_temperature[rows], panel_specs)
+            dc_energy = np.nansum(dc_output["i_mp"] * dc_output["v_mp"], axis=1)
+            annual_dc_wh[config_ids] = dc_energy[row_of_config]
+
+            inverter_groups = {}
+            for position, i in enumerate(config_ids):
+                inverter_groups.setdefault(configurations[i]['inverter_model'], []).append(position)
+
+            for inverter_model, positions in inverter_groups.items():
+                inverter_specs = get_inverter_specs(inverter_model)
+                dc_rows = row_of_config[positions]
+                ac_output = pvlib.inverter.sandia(
+                    dc_output["v_mp"][dc_rows], dc_output["p_mp"][dc_rows], inverter_specs
+                )
+                annual_ac_wh[config_ids[positions]] = np.nansum(ac_output, axis=1)
+
+    return annual_dc_wh, annual_ac_wh
+
+
+# Configuration fields that must be numbers when given
+_NUMERIC_FIELDS = ('azimuth', 'array_tilt', 'pv_panel_width', 'pv_panel_height', 'spacing_factor')
+_TEXT_FIELDS = ('pv_panel_model', 'inverter_model', 'orientation')
+
+
+def _validate_configuration(configuration):
+    if not isinstance(configuration, dict):
+        raise ValueError("Each configuration must be an object")
+    for field in _NUMERIC_FIELDS:
+        value = configuration.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"Configuration {field} must be a number")
+    for field in _TEXT_FIELDS:
+        value = configuration.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"Configuration {field} must be a string")
+
+
+def _normalize_configuration(configuration, area_hectares, weather_cell):
+    """
+    Fill in defaults for one configuration and resolve its azimuth and panel count.
+
+    Raises:
+        ValueError: If the configuration is not an object or a field has the wrong type
+    """
+    _validate_configuration(configuration)
+    latitude = weather_cell['latitude']
+    if configuration.get('azimuth') is not None:
+        azimuth = float(configuration['azimuth'])
+    else:
+        default_orientation = 'NORTH' if latitude < 0 else 'SOUTH'
+        azimuth = orientation_to_degrees(configuration.get('orientation') or default_orientation)
+
+    array_tilt = configuration.get('array_tilt')
+    if array_tilt is None:
+        array_tilt = abs(latitude)
+
+    return {
+        'pv_panel_model': configuration.get('pv_panel_model', DEFAULT_PANEL_MODEL),
+        'inverter_model': configuration.get('inverter_model', DEFAULT_INVERTER_MODEL),
+        'array_tilt': array_tilt,
+        'azimuth': azimuth,
+        'number_of_panels': count_panels(
+            area_hectares,
+            configuration.get('pv_panel_width', 1),
+            configuration.get('pv_panel_height', 1.7),
+            configuration.get('spacing_factor', 1.1),
+        ),
+    }
+
+
+def calculate_solar_configurations(
+    area_hectares,
+    location,
+    configurations,
+    altitude_meters=10,
+    simulation_year=2022,
+    use_country_EFs=True,
+    lifetime=None,
+):
+    """
+    Calculate energy production and carbon offset for many solar configurations at one site.
+    Weather is fetched once and all configurations are simulated together, and the
+    optional lifetime projection (see solar_lifetime) covers all of them in one pass.
+
+    Args:
+        area_hectares (float): Area in hectares
+        location (Point): Location object containing lat/long coordinates
+        configurations (list): Dicts with any of 'pv_panel_model', 'inverter_model',
+            'array_tilt', 'orientation' or 'azimuth' (degrees), 'pv_panel_width',
+            'pv_panel_height' and 'spacing_factor'; missing values use the
+            calculate_solar_impact defaults
+
+    Returns:
+        dict: Shared site information and one result per configuration, in order
+    """
+    if not configurations:
+        raise ValueError("At least one configuration is required")
+    lifetime = parse_lifetime_options(lifetime)
+
+    latitude = location.lat
+    longitude = location.long
+    weather_cell = snap_to_weather_grid(latitude, longitude)
+    configurations = [_normalize_configuration(c, area_hectares, weather_cell) for c in configurations]
+
+    solar_weather_timeseries, solar_weather_metadata, is_north_america = get_solar_weather_data(
+        latitude, longitude, simulation_year
+    )
+    annual_dc_wh, annual_ac_wh = simulate_pv_configurations(
+        solar_weather_timeseries,
+        weather_cell['latitude'],
+        weather_cell['longitude'],
+        altitude_meters,
+        configurations,
+    )
+
+    number_of_panels = np.array([c['number_of_panels'] for c in configurations])
+    annual_ac_energy = annual_ac_wh * number_of_panels / 1_000_000  # Convert to MWh
+
+    country_name, emissions_factor = resolve_emissions_factor(latitude, longitude, use_country_EFs)
+    if use_country_EFs:
+        # MWh * 1000 kWh/MWh * gCO2e/kWh / 1,000,000 g/t
+        carbon_offset = annual_ac_energy * 1000 * emissions_factor / 1_000_000
+    else:
+        # Assuming average grid carbon intensity of 0.5 tons CO2e per MWh
+        carbon_offset = annual_ac_energy * 0.5
+
+    lifetimes = None
+    if lifetime is not None:
+        lifetimes = lifetime_sections(annual_ac_energy, emissions_factor, use_country_EFs, lifetime)
+
+    results = []
+    for i, configuration in enumerate(configurations):
+        results.append({
+            'systemSpecs': {
+                'numberOfPanels': configuration['number_of_panels'],
+                'panelModel': configuration['pv_panel_model'],
+                'inverterModel': configuration['inverter_model'],
+                'tilt': configuration['array_tilt'],
+                'azimuth': configuration['azimuth']
+            },
+            'energyProduction': float(annual_ac_energy[i]),
+            'dcEnergyProduction': float(annual_dc_wh[i] * number_of_panels[i] / 1_000_000),
+            'carbonOffset': float(carbon_offset[i])
+        })
+        if lifetimes is not None:
+            results[-1]['lifetime'] = lifetimes[i]
+
+    return {
+        'landUseType': 'solar',
+        'areaHectares': area_hectares,
+        'location': {
+            'latitude': latitude,
+            'longitude': longitude,
+            'altitude': altitude_meters
+        },
+        'weatherData': {
+            'source': PROVIDER_NAMES[weather_cell['provider']],
+            'year': simulation_year,
+            'cell': {
+                'latitude': weather_cell['latitude'],
+                'longitude': weather_cell['longitude'],
+                'resolutionDegrees': weather_cell['resolutionDegrees']
+            }
+        },
+        'country': country_name,
+        'gridEmissionsFactor': emissions_factor,
+        'results': results
+    }
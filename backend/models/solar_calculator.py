@@ -1,14 +1,24 @@
 from enum import Enum
+import asyncio
+import hashlib
 import pvlib
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from timezonefinder import TimezoneFinder
 import io
 import base64
+import requests
 from dotenv import load_dotenv
 import os
-from .solar_utils import get_country_name_for_emissions, get_emissions_factor
+from .location_context import get_cell_timezone, get_location_context
+from .weather_cache import get_weather_cache
+from .weather_grid import snap_to_weather_grid
+from .yield_surface import estimate_annual_energy
+from .solar_profiles import parse_timeseries_options, summarize_hourly_output
+from .solar_lifetime import add_lifetime_section, parse_lifetime_options
+from .singleflight import SingleFlight
+from .lru_cache import LRUCache
+from .model_store import get_model_store
+from . import http_client
 from .util import Point
 
 load_dotenv()
@@ -25,6 +35,22 @@ _sandia_database = None
 _cec_inverter_database = None
 _anton_inverter_database = None
 
+# Coalesces concurrent downloads of the same weather data
+_weather_flight = SingleFlight()
+
+# Memoized simulate_pv_output stages; each entry holds a few 8760-hour series
+_STAGE_CACHE_SIZE = int(os.environ.get('PV_STAGE_CACHE_SIZE', 16))
+_site_stage_cache = LRUCache(_STAGE_CACHE_SIZE)
+_poa_stage_cache = LRUCache(_STAGE_CACHE_SIZE)
+_dc_stage_cache = LRUCache(_STAGE_CACHE_SIZE)
+_ac_stage_cache = LRUCache(_STAGE_CACHE_SIZE)
+
+# Longest series drawn in the yearly charts; longer ones are aggregated into buckets first
+PLOT_MAX_POINTS = int(os.environ.get('PLOT_MAX_POINTS', 730))
+
+# Weather columns read by the simulation
+_WEATHER_COLUMNS = ('temp_air', 'wind_speed', 'dni', 'ghi', 'dhi')
+
 # Helper functions
 def _load_databases():
     """
@@ -43,16 +69,31 @@ def _load_databases():
 
 
 # Main functions
-def get_solar_weather_data(latitude, longitude, year):
+def get_solar_weather_data(latitude, longitude, year, pvgis_hourly=False):
     """
     Fetch historical solar weather data from either NREL PSM3 (North America) or PVGIS (rest of world).
+    Coordinates are snapped to the provider's native grid before anything else, and
+    downloads are kept in the on-disk weather cache, so repeat lookups skip the network.
+    PVGIS serves a typical meteorological year unless pvgis_hourly is set, in which
+    case the hourly series of the requested year is used.
         
     Returns:
         tuple: (solar_weather_timeseries, solar_weather_metadata, is_north_america)
     """
 
-    # Check if location is roughly in North America
-    is_north_america = (-170 <= longitude <= -50) and (15 <= latitude <= 72)
+    # Snap to the provider grid; the provider is North America's PSM3 or PVGIS
+    cell = snap_to_weather_grid(latitude, longitude)
+    provider = cell['provider']
+    latitude, longitude = cell['latitude'], cell['longitude']
+    is_north_america = provider == 'psm3'
+
+    # PVGIS serves a typical meteorological year, whatever year was asked for, unless hourly data is requested
+    cache_year = year if is_north_america or pvgis_hourly else 'tmy'
+    weather_cache = get_weather_cache()
+    cached = weather_cache.get(provider, latitude, longitude, cache_year)
+    if cached is not None:
+        timeseries, metadata = cached
+        return timeseries, metadata, is_north_america
     
     # Get API credentials
     api_key = os.environ.get('PVLIB_API_KEY')
@@ -65,88 +106,235 @@ def get_solar_weather_data(latitude, longitude, year):
         print(f"api_email is empty: {api_email is None or api_email == ''}")
         raise ValueError("NREL API credentials for pvlib not found in environment variables. Please check your .env file.")
     try:
-        if is_north_america:
-            # Use NREL PSM3 for North American locations
-            timeseries, metadata = pvlib.iotools.get_psm3(
-                latitude=latitude,
-                longitude=longitude,
-                names=year,
-                api_key=api_key,
-                email=api_email,
-                map_variables=True,
-                leap_day=True,
-            )
-        else:
-            # Use PVGIS for rest of world
-            weather_data = pvlib.iotools.get_pvgis_tmy(
-                latitude=latitude,
-                longitude=longitude
-            )
-            
-            # Unpack the tuple and ensure datetime index
-            timeseries, months, inputs, metadata = weather_data
-            # Convert directly from UTC to Melbourne time
-            # Convert timezone
-            tf = TimezoneFinder()
-            timezone_str = tf.timezone_at(lat=latitude, lng=longitude)
-            if timezone_str:
-                timeseries.index = pd.to_datetime(timeseries.index)
-                timeseries = timeseries.tz_convert(timezone_str)
-            
+        # Concurrent requests for the same cell share a single download
+        key = weather_cache.make_key(provider, latitude, longitude, cache_year)
+        timeseries, metadata = _weather_flight.do(
+            key, _download_solar_weather, latitude, longitude, year, is_north_america, api_key, api_email,
+            pvgis_hourly
+        )
         return timeseries, metadata, is_north_america
             
     except Exception as e:
         raise Exception(f"Error fetching solar weather data: {str(e)}")
 
-def create_weather_plots(weather_data):
+def _download_solar_weather(latitude, longitude, year, is_north_america, api_key, api_email, pvgis_hourly=False):
+    """
+    Download weather data from PSM3 or PVGIS and store it in the weather cache.
+
+    Returns:
+        tuple: (solar_weather_timeseries, solar_weather_metadata)
+    """
+    if is_north_america:
+        # Use NREL PSM3 for North American locations
+        timeseries, metadata = _fetch_psm3(latitude, longitude, year, api_key, api_email)
+    elif pvgis_hourly:
+        # A specific historical year from the PVGIS hourly series
+        timeseries, metadata = _fetch_pvgis_hourly(latitude, longitude, year)
+        timezone_str = get_cell_timezone(latitude, longitude)
+        if timezone_str:
+            timeseries = timeseries.tz_convert(timezone_str)
+    else:
+        # Use PVGIS for rest of world
+        weather_data = _fetch_pvgis_tmy(latitude, longitude)
+        
+        # Unpack the tuple and ensure datetime index
+        timeseries, months, inputs, metadata = weather_data
+        # Convert directly from UTC to Melbourne time
+        # Convert timezone
+        timezone_str = get_cell_timezone(latitude, longitude)
+        if timezone_str:
+            timeseries.index = pd.to_datetime(timeseries.index)
+            timeseries = timeseries.tz_convert(timezone_str)
+
+    provider = 'psm3' if is_north_america else 'pvgis'
+    cache_year = year if is_north_america or pvgis_hourly else 'tmy'
+    get_weather_cache().put(provider, latitude, longitude, cache_year, timeseries, metadata)
+
+    return timeseries, metadata
+
+def _fetch_psm3(latitude, longitude, year, api_key, api_email):
+    """
+    Download PSM3 data through the shared HTTP session. Sends the same request as
+    pvlib.iotools.get_psm3(..., map_variables=True, leap_day=True).
+
+    Returns:
+        tuple: (timeseries, metadata)
+    """
+    psm3 = pvlib.iotools.psm3
+    names = str(year)
+    params = {
+        'api_key': api_key,
+        'full_name': psm3.PVLIB_PYTHON,
+        'email': api_email,
+        'affiliation': psm3.PVLIB_PYTHON,
+        'reason': psm3.PVLIB_PYTHON,
+        'mailing_list': 'false',
+        # WKT point: longitude first, four decimals each
+        'wkt': 'POINT(%s %s)' % (('%9.4f' % longitude).strip(), ('%8.4f' % latitude).strip()),
+        'names': names,
+        'attributes': ','.join(psm3.REQUEST_VARIABLE_MAP.get(a, a) for a in psm3.ATTRIBUTES),
+        'leap_day': 'true',
+        'utc': 'false',
+        'interval': 60,
+    }
+    url = psm3.TMY_URL if names.startswith(('tmy', 'tgy', 'tdy')) else psm3.PSM_URL
+
+    response = http_client.get(url, params=params)
+    if not response.ok:
+        # A rejected API key comes back as plain text rather than JSON
+        try:
+            errors = response.json()['errors']
+        except ValueError:
+            errors = response.content.decode('utf-8')
+        raise requests.HTTPError(errors, response=response)
+
+    return pvlib.iotools.parse_psm3(io.StringIO(response.content.decode('utf-8')), map_variables=True)
+
+def _fetch_pvgis_tmy(latitude, longitude):
+    """
+    Download a PVGIS typical meteorological year through the shared HTTP session.
+    Sends the same request as pvlib.iotools.get_pvgis_tmy(latitude, longitude).
+
+    Returns:
+        tuple: (timeseries, months_selected, inputs, metadata)
+    """
+    params = {'lat': latitude, 'lon': longitude, 'outputformat': 'json'}
+    response = http_client.get(pvlib.iotools.pvgis.URL + 'tmy', params=params)
+    if not response.ok:
+        # PVGIS usually explains bad requests in a JSON message
+        try:
+            err_msg = response.json()
+        except ValueError:
+            response.raise_for_status()
+        else:
+            raise requests.HTTPError(err_msg['message'])
+
+    return pvlib.iotools.read_pvgis_tmy(io.StringIO(response.text), pvgis_format='json', map_variables=True)
+
+def _fetch_pvgis_hourly(latitude, longitude, year):
+    """
+    Download one year of PVGIS hourly radiation through the shared HTTP session, with the
+    same request as pvlib.iotools.get_pvgis_hourly(latitude, longitude, year, year,
+    components=True). On a horizontal plane the beam and sky diffuse components are the
+    horizontal irradiance, so GHI, DHI and DNI follow from them and the sun elevation.
+
+    Returns:
+        tuple: (timeseries in UTC, inputs)
+    """
+    params = {
+        'lat': latitude,
+        'lon': longitude,
+        'outputformat': 'json',
+        'angle': 0,
+        'aspect': 0,
+        'pvcalculation': 0,
+        'components': 1,
+        'usehorizon': 1,
+        'startyear': year,
+        'endyear': year,
+    }
+    response = http_client.get(pvlib.iotools.pvgis.URL + 'seriescalc', params=params)
+    if not response.ok:
+        try:
+            err_msg = response.json()
+        except ValueError:
+            response.raise_for_status()
+        else:
+            raise requests.HTTPError(err_msg['message'])
+
+    data, inputs, metadata = pvlib.iotools.read_pvgis_hourly(
+        io.StringIO(response.text), pvgis_format='json', map_variables=True
+    )
+    ghi = data['poa_direct'] + data['poa_sky_diffuse']
+    dhi = data['poa_sky_diffuse']
+    dni = pvlib.irradiance.dni(ghi, dhi, 90 - data['solar_elevation']).fillna(0)
+    timeseries = pd.DataFrame({
+        'ghi': ghi,
+        'dni': dni,
+        'dhi': dhi,
+        'temp_air': data['temp_air'],
+        'wind_speed': data['wind_speed'],
+    }, index=data.index)
+    return timeseries, inputs
+
+def _downsample(series, max_points, how):
+    """
+    Aggregate a series into at most max_points consecutive buckets, labelled
+    with the first timestamp of each bucket.
+    """
+    if len(series) <= max_points:
+        return series
+    bucket = -(-len(series) // max_points)
+    downsampled = series.groupby(np.arange(len(series)) // bucket).agg(how)
+    downsampled.index = series.index[::bucket]
+    return downsampled
+
+def _new_figure(figsize):
+    """
+    Create a figure on the non-interactive Agg canvas. Figures are not registered
+    with pyplot, so they are thread safe and are freed once unreferenced.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _figure_to_base64(fig, **savefig_kwargs):
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', **savefig_kwargs)
+    return base64.b64encode(buf.getvalue()).decode('utf-8')
+
+def create_weather_plots(weather_data, max_points=PLOT_MAX_POINTS):
+    """Create plots of one day of irradiance and a year of temperature and wind speed."""
     # Create a figure with two subplots stacked vertically
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    fig = _new_figure((12, 10))
+    ax1, ax2 = fig.subplots(2, 1)
 
     # First subplot: Daily Solar Radiation Pattern
-    weather_data[['ghi', 'dni', 'dhi']].head(24).plot(ax=ax1)
+    first_day = weather_data.head(24)
+    for column, label in (('ghi', 'Global Horizontal'), ('dni', 'Direct Normal'), ('dhi', 'Diffuse Horizontal')):
+        ax1.plot(first_day.index, first_day[column], label=label)
     ax1.set_title('Daily Solar Radiation Pattern')
     ax1.set_xlabel('Hour of Day')
     ax1.set_ylabel('Irradiance (W/m²)')
-    ax1.legend(['Global Horizontal', 'Direct Normal', 'Diffuse Horizontal'])
+    ax1.legend()
 
     # Second subplot: Temperature and Wind Speed
     ax3 = ax2.twinx()
 
     # Plot temperature on primary axis
-    weather_data['temp_air'].plot(ax=ax2, color='red')
+    temperature = _downsample(weather_data['temp_air'], max_points, 'mean')
+    ax2.plot(temperature.index, temperature, color='red')
     ax2.set_xlabel('Time')
     ax2.set_ylabel('Temperature (°C)', color='red')
 
     # Plot wind speed on secondary axis
-    weather_data['wind_speed'].plot(ax=ax3, color='blue')
+    wind_speed = _downsample(weather_data['wind_speed'], max_points, 'mean')
+    ax3.plot(wind_speed.index, wind_speed, color='blue')
     ax3.set_ylabel('Wind Speed (m/s)', color='blue')
 
     # Add a title for the second subplot
     ax2.set_title('Temperature and Wind Speed Over Time')
 
     # Adjust layout to prevent overlap
-    plt.tight_layout()
+    fig.tight_layout()
 
-    # Save plot to a bytes buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    
     # Convert to base64 string
-    plot_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-    return plot_base64
+    return _figure_to_base64(fig)
 
-def create_ac_output_plot(pv_output):
+def create_ac_output_plot(pv_output, max_points=PLOT_MAX_POINTS):
     """Create a plot of AC output over time."""
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
+    import matplotlib.dates as mdates
+
     # Create figure with two subplots
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    fig = _new_figure((12, 10))
+    ax1, ax2 = fig.subplots(2, 1)
 
-    # Plot single day (Jan 2)
-    jan2_data = pv_output[pv_output.index.date == pd.Timestamp('2022-01-02').date()]
+    # Plot single day (the second day of the series, Jan 2)
+    second_day = (pv_output.index[0] + pd.Timedelta(days=1)).date()
+    jan2_data = pv_output[pv_output.index.date == second_day]
     ax1.plot(jan2_data.index.hour, jan2_data['AC Output (Wh)'], 'o-', label='AC Output')
     ax1.set_title('AC Output in one day')
     ax1.set_xlabel('Hour of Day')
@@ -156,8 +344,9 @@ def create_ac_output_plot(pv_output):
     ax1.set_xticks(range(0, 24, 2))  # Show ticks every 2 hours
     ax1.set_xticklabels([f'{i:02d}:00' for i in range(0, 24, 2)])  # Format as HH:00
 
-    # Plot full time series
-    ax2.plot(pv_output.index, pv_output['AC Output (Wh)'].clip(lower=0), label='AC Output')
+    # Plot full time series; bucket maxima keep the shape of the daily peaks
+    ac_output = _downsample(pv_output['AC Output (Wh)'].clip(lower=0), max_points, 'max')
+    ax2.plot(ac_output.index, ac_output, label='AC Output')
     ax2.set_title('AC Output in one year')
     ax2.set_xlabel('Date')
     ax2.set_ylabel('AC Output (Wh)')
@@ -168,55 +357,63 @@ def create_ac_output_plot(pv_output):
     ax2.tick_params(axis='x', rotation=45)
     
     # Adjust layout to prevent label cutoff
-    plt.tight_layout()
-    
-    # Save plot to bytes buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
     
     # Convert to base64 string
-    buf.seek(0)
-    return base64.b64encode(buf.getvalue()).decode('utf-8')
+    return _figure_to_base64(fig, bbox_inches='tight')
 
-def simulate_pv_output(
-    solar_weather_timeseries,
-    latitude,
-    longitude,
-    altitude_meters,
-    array_tilt,
-    orientation,
-    pv_panel_model,
-    inverter_model,
-    number_of_panels,
-):
+def get_panel_specs(pv_panel_model):
     """
-    Simulate PV system output using pvlib.
-      
-    Returns:
-        pd.DataFrame: Results including DC and AC output
+    Look up a panel model in the compact model store, then in the CEC or Sandia database.
     """
-   # Load databases if not already loaded
+    model_store = get_model_store()
+    if model_store is not None:
+        panel_specs = model_store.panel(pv_panel_model)
+        if panel_specs is not None:
+            return panel_specs
     _load_databases()
-    
-    # Check which database contains our panel model
     if pv_panel_model in _cec_database.columns:
-        panel_specs = _cec_database[pv_panel_model]
+        return _cec_database[pv_panel_model]
     elif pv_panel_model in _sandia_database.columns:
-        panel_specs = _sandia_database[pv_panel_model]
-    else:
-        raise ValueError(f"Panel model {pv_panel_model} not found in either CEC or Sandia database")
-    
-    # Check which database contains our inverter model
+        return _sandia_database[pv_panel_model]
+    raise ValueError(f"Panel model {pv_panel_model} not found in either CEC or Sandia database")
+
+def get_inverter_specs(inverter_model):
+    """
+    Look up an inverter model in the compact model store, then in the CEC or Anton Driesse inverter database.
+    """
+    model_store = get_model_store()
+    if model_store is not None:
+        inverter_specs = model_store.inverter(inverter_model)
+        if inverter_specs is not None:
+            return inverter_specs
+    _load_databases()
     if inverter_model in _cec_inverter_database.columns:
-        inverter_specs = _cec_inverter_database[inverter_model]
+        return _cec_inverter_database[inverter_model]
     elif inverter_model in _anton_inverter_database.columns:
-        inverter_specs = _anton_inverter_database[inverter_model]
-    else:
-        raise ValueError(f"Inverter model {inverter_model} not found in either CEC or Anton Driesse inverter database")
-
+        return _anton_inverter_database[inverter_model]
+    raise ValueError(f"Inverter model {inverter_model} not found in either CEC or Anton Driesse inverter database")
 
+def _weather_fingerprint(solar_weather_timeseries):
+    """
+    Hash the timestamps and the weather columns the simulation reads, so that
+    stage caches can be keyed on the weather without holding on to it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.DatetimeIndex(solar_weather_timeseries.index).asi8.tobytes())
+    digest.update(str(solar_weather_timeseries.index.tz).encode())
+    for column in _WEATHER_COLUMNS:
+        digest.update(np.ascontiguousarray(solar_weather_timeseries[column].to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+def compute_site_geometry(solar_weather_timeseries, latitude, longitude, altitude_meters):
+    """
+    Solar position, extra-terrestrial radiation and air mass for a site, computed
+    without the cache (see get_site_geometry for the memoized version).
 
+    Returns:
+        dict: 'solar_position' (pd.DataFrame), 'dni_extra' and 'airmass' (pd.Series)
+    """
     # Calculate solar position
     solar_position = pvlib.solarposition.get_solarposition(
         time=solar_weather_timeseries.index,
@@ -226,6 +423,24 @@ def simulate_pv_output(
         temperature=solar_weather_timeseries["temp_air"],
     )
 
+    # Calculate air mass
+    airmass = pvlib.atmosphere.get_absolute_airmass(
+        pvlib.atmosphere.get_relative_airmass(solar_position["apparent_zenith"]),
+        pvlib.atmosphere.alt2pres(altitude_meters),
+    )
+
+    return {
+        'solar_position': solar_position,
+        'dni_extra': pvlib.irradiance.get_extra_radiation(solar_weather_timeseries.index),
+        'airmass': airmass,
+    }
+
+def _poa_stage(solar_weather_timeseries, site, array_tilt, orientation):
+    """
+    Plane-of-array irradiance and angle of incidence for a tilt and azimuth.
+    """
+    solar_position = site['solar_position']
+
     # Calculate total irradiance on panel surface
     total_irradiance = pvlib.irradiance.get_total_irradiance(
         array_tilt,
@@ -235,18 +450,11 @@ def simulate_pv_output(
         solar_weather_timeseries["dni"],
         solar_weather_timeseries["ghi"],
         solar_weather_timeseries["dhi"],
-        dni_extra=pvlib.irradiance.get_extra_radiation(solar_weather_timeseries.index),
+        dni_extra=site['dni_extra'],
         model="haydavies",
     )
 
-   
-
-    # Calculate air mass and angle of incidence
-    airmass = pvlib.atmosphere.get_absolute_airmass(
-        pvlib.atmosphere.get_relative_airmass(solar_position["apparent_zenith"]),
-        pvlib.atmosphere.alt2pres(altitude_meters),
-    )
-
+    # Calculate angle of incidence
     aoi = pvlib.irradiance.aoi(
         array_tilt,
         orientation,
@@ -254,17 +462,26 @@ def simulate_pv_output(
         solar_position["azimuth"],
     )
 
+    return {
+        'total_irradiance': total_irradiance,
+        'aoi': aoi,
+    }
+
+def _dc_stage(solar_weather_timeseries, site, poa, panel_specs):
+    """
+    Per-panel DC output (SAPM) for a panel model.
+    """
+    total_irradiance = poa['total_irradiance']
+
     # Calculate effective irradiance
     effective_irradiance = pvlib.pvsystem.sapm_effective_irradiance(
         total_irradiance["poa_direct"],
         total_irradiance["poa_diffuse"],
-        airmass,
-        aoi,
+        site['airmass'],
+        poa['aoi'],
         panel_specs,
     )
 
-
-
     # Calculate cell temperature
     cell_temperature = pvlib.temperature.sapm_cell(
         total_irradiance["poa_global"],
@@ -273,20 +490,85 @@ def simulate_pv_output(
         **pvlib.temperature.TEMPERATURE_MODEL_PARAMETERS["sapm"]["open_rack_glass_glass"],
     )
 
-    
     # Calculate DC output
-    dc_output = pvlib.pvsystem.sapm(
+    return pvlib.pvsystem.sapm(
         effective_irradiance,
         cell_temperature,
         panel_specs
     )
 
-    # Calculate AC output
-    ac_output = pvlib.inverter.sandia(
+def _ac_stage(dc_output, inverter_specs):
+    """
+    Per-panel AC output (Sandia inverter model) for an inverter.
+    """
+    return pvlib.inverter.sandia(
         dc_output["v_mp"],
         dc_output["p_mp"],
         inverter_specs
     )
+
+def _site_key(solar_weather_timeseries, latitude, longitude, altitude_meters):
+    return (_weather_fingerprint(solar_weather_timeseries), latitude, longitude, altitude_meters)
+
+def get_site_geometry(solar_weather_timeseries, latitude, longitude, altitude_meters, site_key=None):
+    """
+    Get the (memoized) site stage: solar position, extra-terrestrial radiation and air mass.
+    Callers that key later stages on the site can pass its precomputed site_key,
+    so the weather is only hashed once.
+
+    Returns:
+        dict: 'solar_position' (pd.DataFrame), 'dni_extra' and 'airmass' (pd.Series)
+    """
+    if site_key is None:
+        site_key = _site_key(solar_weather_timeseries, latitude, longitude, altitude_meters)
+    return _site_stage_cache.get_or_compute(
+        site_key, compute_site_geometry, solar_weather_timeseries, latitude, longitude, altitude_meters
+    )
+
+def simulate_pv_output(
+    solar_weather_timeseries,
+    latitude,
+    longitude,
+    altitude_meters,
+    array_tilt,
+    orientation,
+    pv_panel_model,
+    inverter_model,
+    number_of_panels,
+):
+    """
+    Simulate PV system output using pvlib.
+
+    The model chain runs in stages that are memoized on their own inputs:
+    site (solar position, air mass), plane-of-array irradiance (tilt, azimuth),
+    DC output (panel model) and AC output (inverter model). Each key also
+    includes everything upstream, so changing one parameter only recomputes
+    the stages after it, and changing the panel count recomputes nothing.
+      
+    Returns:
+        pd.DataFrame: Results including DC and AC output
+    """
+    # Check which databases contain our panel and inverter models
+    panel_specs = get_panel_specs(pv_panel_model)
+    inverter_specs = get_inverter_specs(inverter_model)
+
+    site_key = _site_key(solar_weather_timeseries, latitude, longitude, altitude_meters)
+    site = get_site_geometry(solar_weather_timeseries, latitude, longitude, altitude_meters, site_key=site_key)
+
+    poa_key = site_key + (array_tilt, orientation)
+    poa = _poa_stage_cache.get_or_compute(
+        poa_key, _poa_stage, solar_weather_timeseries, site, array_tilt, orientation
+    )
+
+    dc_key = poa_key + (pv_panel_model,)
+    dc_output = _dc_stage_cache.get_or_compute(
+        dc_key, _dc_stage, solar_weather_timeseries, site, poa, panel_specs
+    )
+
+    ac_key = dc_key + (inverter_model,)
+    ac_output = _ac_stage_cache.get_or_compute(ac_key, _ac_stage, dc_output, inverter_specs)
+
+    solar_position = site['solar_position']
  
     # Create results DataFrame
     results = pd.DataFrame({
@@ -299,6 +581,230 @@ def simulate_pv_output(
 
     return results
 
+def get_simulation_cache_stats():
+    """
+    Get hit/miss counters for each memoized simulation stage.
+    """
+    return {
+        'site': _site_stage_cache.stats(),
+        'planeOfArray': _poa_stage_cache.stats(),
+        'dc': _dc_stage_cache.stats(),
+        'ac': _ac_stage_cache.stats(),
+    }
+
+def orientation_to_degrees(orientation):
+    """
+    Convert a text orientation (NORTH, EAST, SOUTH, WEST) to an azimuth in degrees.
+    """
+    try:
+        return Orientation[orientation.upper()].value
+    except (KeyError, AttributeError):
+        raise ValueError(f'Invalid orientation. Must be one of: {", ".join(Orientation.__members__.keys())}')
+
+def count_panels(area_hectares, pv_panel_width, pv_panel_height, spacing_factor):
+    """
+    Number of panels that fit in an area, including spacing between panels.
+    """
+    # Calculate panel area including spacing
+    panel_area_m2 = pv_panel_width * pv_panel_height * spacing_factor
+    
+    # Convert area to square meters and calculate number of panels
+    area_m2 = area_hectares * 10000
+    
+    # Calculate number of panels based on system capacity
+    # capacity_based_panels = pv_system_capacity_watts / pv_panel_capacity_watts
+
+    return int(area_m2 / panel_area_m2)
+
+def solar_system_layout(area_hectares, location, orientation, array_tilt, pv_panel_width, pv_panel_height, spacing_factor):
+    """
+    Resolve orientation and tilt defaults and work out how many panels fit in the area.
+    The simulation runs on the weather grid cell containing the location, so the
+    default tilt follows the latitude of the cell's grid node.
+
+    Returns:
+        tuple: (latitude, longitude, weather_cell, orientation_degrees, array_tilt, number_of_panels)
+    """
+    orientation = orientation_to_degrees(orientation)
+
+    latitude = location.lat
+    longitude = location.long
+    weather_cell = snap_to_weather_grid(latitude, longitude)
+
+    # Set tilt to latitude if not specified
+    if array_tilt is None:
+        array_tilt = abs(weather_cell['latitude'])
+
+    number_of_panels = count_panels(area_hectares, pv_panel_width, pv_panel_height, spacing_factor)
+
+    return latitude, longitude, weather_cell, orientation, array_tilt, number_of_panels
+
+def resolve_emissions_factor(latitude, longitude, use_country_EFs):
+    """
+    Look up the country and its grid emissions factor (gCO2e/kWh) for a location.
+
+    Returns:
+        tuple: (country_name, emissions_factor), or ("NA", "NA") if country EFs are not used
+    """
+    if not use_country_EFs:
+        return "NA", "NA"
+    # Looked up at the location itself and shared by requests for the same point
+    context = get_location_context(latitude, longitude)
+    return context.emissions_country, context.emissions_factor # the factor is in gCO2e/kWh
+
+def _build_solar_result(
+    area_hectares,
+    latitude,
+    longitude,
+    altitude_meters,
+    orientation,
+    array_tilt,
+    number_of_panels,
+    pv_panel_model,
+    inverter_model,
+    simulation_year,
+    weather_cell,
+    is_north_america,
+    annual_dc_wh,
+    annual_ac_wh,
+    country_name,
+    emissions_factor,
+    use_country_EFs,
+):
+    """
+    Turn annual simulated DC/AC energy (Wh) into the solar response dict.
+    """
+    # Charts are rendered separately, see solar_plots and /api/solar/plots
+    
+    # Calculate annual energy production (MWh)
+    annual_dc_energy = annual_dc_wh / 1_000_000  # Convert to MWh
+    annual_ac_energy = annual_ac_wh / 1_000_000  # Convert to MWh
+
+    if use_country_EFs:
+        # calculate offset based on grid emissions factors for the respective country
+        annual_energy_kWh = annual_ac_wh / 1000 # Convert to kWh
+        # Calculate carbon offset (metric tons CO2e). 1 metric ton CO2e is ~ equivalent to 1 translatlantic (NYC to London) flight.
+        carbon_offset = (annual_energy_kWh * emissions_factor) / 1_000_000 # Convert from g to metric tons
+    else:
+        # Assuming average grid carbon intensity of 0.5 tons CO2e per MWh
+        carbon_offset = annual_ac_energy * 0.5
+    
+    return {
+        'landUseType': 'solar',
+        'areaHectares': area_hectares,
+        'location': {
+            'latitude': latitude,
+            'longitude': longitude,
+            'altitude': altitude_meters,
+            'orientation': orientation
+        },
+        'systemSpecs': {
+            'numberOfPanels': number_of_panels,
+            'panelModel': pv_panel_model,
+            'inverterModel': inverter_model,
+            'tilt': array_tilt
+        },
+        'weatherData': {
+            'source': 'NREL PSM3' if is_north_america else 'PVGIS',
+            'year': simulation_year,
+            'cell': {
+                'latitude': weather_cell['latitude'],
+                'longitude': weather_cell['longitude'],
+                'resolutionDegrees': weather_cell['resolutionDegrees']
+            }
+        },
+        'energyProduction': annual_ac_energy,
+        'carbonOffset': carbon_offset,
+        'country': country_name,
+        'gridEmissionsFactor': emissions_factor
+    }
+
+def _estimated_solar_result(
+    area_hectares,
+    latitude,
+    longitude,
+    altitude_meters,
+    orientation,
+    array_tilt,
+    number_of_panels,
+    pv_panel_model,
+    inverter_model,
+    simulation_year,
+    weather_cell,
+    use_country_EFs,
+):
+    """
+    Build the solar response from the precomputed yield surface, without weather or simulation.
+
+    Returns:
+        dict: Results as from calculate_solar_impact plus an 'estimate' section, or
+            None if the surface cannot answer for this location and layout
+    """
+    estimated = estimate_annual_energy(
+        latitude, longitude, weather_cell, orientation, array_tilt,
+        pv_panel_model, inverter_model, number_of_panels,
+    )
+    if estimated is None:
+        return None
+
+    annual_dc_wh, annual_ac_wh, surface_header = estimated
+    country_name, emissions_factor = resolve_emissions_factor(latitude, longitude, use_country_EFs)
+    result = _build_solar_result(
+        area_hectares, latitude, longitude, altitude_meters, orientation, array_tilt,
+        number_of_panels, pv_panel_model, inverter_model, simulation_year, weather_cell,
+        weather_cell['provider'] == 'psm3', annual_dc_wh, annual_ac_wh, country_name,
+        emissions_factor, use_country_EFs,
+    )
+    result['estimate'] = {
+        'method': 'yield surface',
+        'surfaceYear': surface_header['year'],
+        'resolutionDegrees': surface_header['stepDegrees']
+    }
+    return result
+
+def _simulate_annual_energy(
+    solar_weather_timeseries,
+    latitude,
+    longitude,
+    altitude_meters,
+    array_tilt,
+    orientation,
+    pv_panel_model,
+    inverter_model,
+    number_of_panels,
+    engine="pvlib",
+    use_float32=False,
+    hourly=False,
+):
+    """
+    Run the PV simulation with the selected engine and return the annual totals.
+    'pvlib' runs simulate_pv_output; 'numpy' runs the fused fast path in pv_fastpath.
+
+    Returns:
+        tuple: (annual_dc_wh, annual_ac_wh, hourly_ac_wh) for the whole array;
+            hourly_ac_wh is a Series if hourly is set, otherwise None
+    """
+    if engine == "numpy":
+        from .pv_fastpath import simulate_pv_totals
+        totals = simulate_pv_totals(
+            solar_weather_timeseries, latitude, longitude, altitude_meters, array_tilt,
+            orientation, pv_panel_model, inverter_model, number_of_panels,
+            use_float32=use_float32, return_hourly=hourly,
+        )
+        hourly_ac_wh = None
+        if hourly:
+            hourly_ac_wh = pd.Series(totals['hourly_ac_wh'], index=solar_weather_timeseries.index)
+        return totals['annual_dc_wh'], totals['annual_ac_wh'], hourly_ac_wh
+    if engine != "pvlib":
+        raise ValueError(f"Unknown simulation engine: {engine}")
+
+    pv_output = simulate_pv_output(
+        solar_weather_timeseries, latitude, longitude, altitude_meters, array_tilt,
+        orientation, pv_panel_model, inverter_model, number_of_panels,
+    )
+    hourly_ac_wh = pv_output["AC Output (Wh)"] if hourly else None
+    return pv_output["DC Output (Wh)"].sum(), pv_output["AC Output (Wh)"].sum(), hourly_ac_wh
+
 def calculate_solar_impact(
     area_hectares,
     location,  # Changed from separate lat/long to Point object
@@ -311,7 +817,12 @@ def calculate_solar_impact(
     array_tilt=None,  # Will be set to abs(latitude) if None
     simulation_year=2022,
     spacing_factor=1.1,  # Multiplier for panel area to account for spacing (default 10% spacing)
-    use_country_EFs=True # set to False if country-level calculations take too long
+    use_country_EFs=True, # set to False if country-level calculations take too long
+    engine="pvlib",  # "numpy" uses the fused fast path (annual totals only)
+    use_float32=False,  # numpy engine only: float32 hourly math, within pv_fastpath.FLOAT32_RTOL
+    estimate=False,  # answer from the precomputed yield surface when it covers the request
+    timeseries=None,  # optional compact profiles, see solar_profiles.parse_timeseries_options
+    lifetime=None  # optional lifetime projection, see solar_lifetime.parse_lifetime_options
 ):
     """
     Calculate the energy production and carbon offset from solar panels.
@@ -320,29 +831,22 @@ def calculate_solar_impact(
     Returns:
         dict: Results including energy production and carbon offset
     """
-    # Convert text orientation to degrees
-    try:
-        orientation = Orientation[orientation.upper()].value
-    except KeyError:
-        raise ValueError(f'Invalid orientation. Must be one of: {", ".join(Orientation.__members__.keys())}')
-
-    latitude = location.lat
-    longitude = location.long
-
-    # Set tilt to latitude if not specified
-    if array_tilt is None:
-        array_tilt = abs(latitude)
+    latitude, longitude, weather_cell, orientation, array_tilt, number_of_panels = solar_system_layout(
+        area_hectares, location, orientation, array_tilt, pv_panel_width, pv_panel_height, spacing_factor
+    )
 
-    # Calculate panel area including spacing
-    panel_area_m2 = pv_panel_width * pv_panel_height * spacing_factor
-    
-    # Convert area to square meters and calculate number of panels
-    area_m2 = area_hectares * 10000
-    number_of_panels = int(area_m2 / panel_area_m2)
-    
-    # Calculate number of panels based on system capacity
-    # capacity_based_panels = pv_system_capacity_watts / pv_panel_capacity_watts
+    timeseries = parse_timeseries_options(timeseries)
+    lifetime = parse_lifetime_options(lifetime)
 
+    # The surface has no hourly output, so profiles always need the simulation
+    if estimate and timeseries is None:
+        # Falls through to the full simulation if the surface cannot answer
+        result = _estimated_solar_result(
+            area_hectares, latitude, longitude, altitude_meters, orientation, array_tilt, number_of_panels,
+            pv_panel_model, inverter_model, simulation_year, weather_cell, use_country_EFs,
+        )
+        if result is not None:
+            return add_lifetime_section(result, lifetime, use_country_EFs)
 
     try:
 
@@ -351,68 +855,44 @@ def calculate_solar_impact(
             latitude, longitude, simulation_year
         )
 
-        
-
         # Calculate PV output
-        pv_output = simulate_pv_output(
+        annual_dc_wh, annual_ac_wh, hourly_ac_wh = _simulate_annual_energy(
             solar_weather_timeseries,
-            latitude,
-            longitude,
+            weather_cell['latitude'],
+            weather_cell['longitude'],
             altitude_meters,
             array_tilt,
             orientation,
             pv_panel_model,
             inverter_model,
             number_of_panels,
+            engine,
+            use_float32,
+            timeseries is not None,
         )
-        
-        # Create plots in case we want to add to frontend
-        # weather_plot_base64 = create_weather_plots(solar_weather_timeseries)
-        # ac_output_plot_base64 = create_ac_output_plot(pv_output)
-        
-        # Calculate annual energy production (MWh)
-        annual_dc_energy = pv_output["DC Output (Wh)"].sum() / 1_000_000  # Convert to MWh
-        annual_ac_energy = pv_output["AC Output (Wh)"].sum() / 1_000_000  # Convert to MWh
-
-        if use_country_EFs:
-            # calculate offset based on grid emissions factors for the respective country
-            annual_energy_kWh = pv_output["AC Output (Wh)"].sum() / 1000 # Convert to kWh
-            country_name = get_country_name_for_emissions(latitude, longitude)
-            emissions_factor = get_emissions_factor(country_name) # this value is in gCO2e/kWh
-            # Calculate carbon offset (metric tons CO2e). 1 metric ton CO2e is ~ equivalent to 1 translatlantic (NYC to London) flight.
-            carbon_offset = (annual_energy_kWh * emissions_factor) / 1_000_000 # Convert from g to metric tons
-        else:
-            # Assuming average grid carbon intensity of 0.5 tons CO2e per MWh
-            carbon_offset = annual_ac_energy * 0.5
-            country_name = "NA"
-            emissions_factor = "NA"
-        
-        return {
-            'landUseType': 'solar',
-            'areaHectares': area_hectares,
-            'location': {
-                'latitude': latitude,
-                'longitude': longitude,
-                'altitude': altitude_meters,
-                'orientation': orientation
-            },
-            'systemSpecs': {
-                'numberOfPanels': number_of_panels,
-                'panelModel': pv_panel_model,
-                'inverterModel': inverter_model,
-                'tilt': array_tilt
-            },
-            'weatherData': {
-                'source': 'NREL PSM3' if is_north_america else 'PVGIS',
-                'year': simulation_year
-                #'weather_timeseries': solar_weather_timeseries,
-                #'plot': weather_plot_base64
-            },
-            'energyProduction': annual_ac_energy,
-            #'energyPlot': ac_output_plot_base64
-            'carbonOffset': carbon_offset,
-            'country': country_name,
-            'gridEmissionsFactor': emissions_factor
-        }
+
+        country_name, emissions_factor = resolve_emissions_factor(latitude, longitude, use_country_EFs)
+
+        result = _build_solar_result(
+            area_hectares, latitude, longitude, altitude_meters, orientation, array_tilt,
+            number_of_panels, pv_panel_model, inverter_model, simulation_year, weather_cell, is_north_america,
+            annual_dc_wh, annual_ac_wh, country_name, emissions_factor, use_country_EFs,
+        )
+        if timeseries is not None:
+            result['timeseries'] = summarize_hourly_output(
+                hourly_ac_wh, timeseries['monthly'], timeseries['monthByHour'], timeseries['resolutionHours']
+            )
+        return add_lifetime_section(result, lifetime, use_country_EFs)
     except Exception as e:
         raise Exception(f"Failed to calculate solar impact: {str(e)}")
+
+async def calculate_solar_impact_async(*args, **kwargs):
+    """
+    Async version of calculate_solar_impact, taking the same arguments. The whole
+    calculation (weather download, simulation, emissions factor lookup) runs in a
+    worker thread, off the event loop.
+
+    Returns:
+        dict: Results including energy production and carbon offset
+    """
+    return await asyncio.to_thread(calculate_solar_impact, *args, **kwargs)
@@ -0,0 +1,173 @@
+import math
+import numpy as np
+
+DEFAULT_LIFETIME_YEARS = 25
+MAX_LIFETIME_YEARS = 50
+# Typical crystalline silicon module degradation, fraction of output lost per year
+DEFAULT_DEGRADATION_RATE = 0.005
+# Grid intensity assumed when country emissions factors are not used (0.5 tCO2e/MWh)
+DEFAULT_EMISSIONS_FACTOR = 500
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _parse_grid_decarbonization(trajectory):
+    """
+    Validate a 'gridDecarbonization' trajectory, keeping only the form that is used
+    (factors first, then annualDecline, then targetFactor and targetYear).
+
+    Returns:
+        dict: The trajectory with float values
+    """
+    if not isinstance(trajectory, dict):
+        raise ValueError("gridDecarbonization must be an object")
+    if 'factors' in trajectory:
+        factors = trajectory['factors']
+        if not isinstance(factors, list) or not factors or not all(_is_number(f) and f >= 0 for f in factors):
+            raise ValueError("gridDecarbonization factors must be a non-empty list of non-negative numbers")
+        return {'factors': [float(f) for f in factors]}
+    if 'annualDecline' in trajectory:
+        annual_decline = trajectory['annualDecline']
+        if not _is_number(annual_decline) or not 0 <= annual_decline < 1:
+            raise ValueError("gridDecarbonization annualDecline must be a fraction from 0 to 1")
+        return {'annualDecline': float(annual_decline)}
+    if 'targetFactor' in trajectory and 'targetYear' in trajectory:
+        target_factor = trajectory['targetFactor']
+        target_year = trajectory['targetYear']
+        if not _is_number(target_factor) or target_factor < 0:
+            raise ValueError("gridDecarbonization targetFactor must be a non-negative number")
+        if not _is_number(target_year) or target_year <= 0:
+            raise ValueError("gridDecarbonization targetYear must be a positive number of years")
+        return {'targetFactor': float(target_factor), 'targetYear': float(target_year)}
+    raise ValueError("gridDecarbonization needs annualDecline, targetFactor and targetYear, or factors")
+
+
+def parse_lifetime_options(options):
+    """
+    Validate the 'lifetime' request options:
+    'years' (default 25), 'degradationRate' (fraction per year, default 0.005) and an
+    optional 'gridDecarbonization' trajectory for the emissions factor, one of
+    {'annualDecline': fraction per year}, {'targetFactor': gCO2e/kWh, 'targetYear': years from now}
+    or {'factors': [gCO2e/kWh for each year]}.
+
+    Returns:
+        dict: Normalized options, or None if no projection was requested
+    """
+    if not options:
+        return None
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError("lifetime must be an object")
+
+    years = options.get('years', DEFAULT_LIFETIME_YEARS)
+    if isinstance(years, bool) or not isinstance(years, int) or not 1 <= years <= MAX_LIFETIME_YEARS:
+        raise ValueError(f"lifetime years must be an integer from 1 to {MAX_LIFETIME_YEARS}")
+    degradation_rate = options.get('degradationRate', DEFAULT_DEGRADATION_RATE)
+    if not _is_number(degradation_rate) or not 0 <= degradation_rate < 1:
+        raise ValueError("degradationRate must be a fraction from 0 to 1")
+
+    trajectory = options.get('gridDecarbonization')
+    if trajectory is not None:
+        trajectory = _parse_grid_decarbonization(trajectory)
+
+    return {'years': years, 'degradationRate': float(degradation_rate), 'gridDecarbonization': trajectory}
+
+
+def emissions_factor_trajectory(emissions_factor, years, trajectory=None):
+    """
+    Emissions factor (gCO2e/kWh) for each year of operation, starting from today's factor.
+
+    Returns:
+        np.ndarray: Shape (years,)
+    """
+    year = np.arange(years)
+    if trajectory is None:
+        return np.full(years, float(emissions_factor))
+    if 'factors' in trajectory:
+        # Explicit values; the last one holds for the remaining years
+        factors = np.asarray(trajectory['factors'], dtype=float)
+        return factors[np.minimum(year, len(factors) - 1)]
+    if 'annualDecline' in trajectory:
+        return emissions_factor * (1 - trajectory['annualDecline']) ** year
+    # Linear path to the target, flat afterwards
+    return np.interp(year, [0, trajectory['targetYear']], [emissions_factor, trajectory['targetFactor']])
+
+
+def project_lifetime(
+    annual_energy_mwh,
+    emissions_factor,
+    years=DEFAULT_LIFETIME_YEARS,
+    degradation_rate=DEFAULT_DEGRADATION_RATE,
+    grid_decarbonization=None,
+):
+    """
+    Project first-year energy over the system lifetime, for one or many configurations at once.
+    Output falls by degradation_rate each year and the emissions factor follows the
+    decarbonization trajectory; everything is a (configurations, years) array.
+
+    Args:
+        annual_energy_mwh (float or array): First-year AC energy per configuration
+        emissions_factor (float): Today's grid emissions factor (gCO2e/kWh)
+
+    Returns:
+        dict: 'energyProduction', 'cumulativeEnergyProduction' (MWh), 'carbonOffset',
+            'cumulativeCarbonOffset' (tCO2e) arrays, plus the 'gridEmissionsFactor' per year
+    """
+    if emissions_factor is None:
+        raise ValueError("No grid emissions factor available for the lifetime projection")
+
+    year = np.arange(years)
+    energy = np.asarray(annual_energy_mwh, dtype=float)[..., np.newaxis] * (1 - degradation_rate) ** year
+    factors = emissions_factor_trajectory(emissions_factor, years, grid_decarbonization)
+    # MWh * 1000 kWh/MWh * gCO2e/kWh / 1,000,000 g/t
+    offset = energy * factors / 1000
+
+    return {
+        'energyProduction': energy,
+        'cumulativeEnergyProduction': np.cumsum(energy, axis=-1),
+        'carbonOffset': offset,
+        'cumulativeCarbonOffset': np.cumsum(offset, axis=-1),
+        'gridEmissionsFactor': factors,
+    }
+
+
+def lifetime_sections(annual_energy_mwh, emissions_factor, use_country_EFs, options):
+    """
+    Build the 'lifetime' response section for each configuration.
+
+    Returns:
+        list: One dict of per-year lists per entry of annual_energy_mwh
+    """
+    if not use_country_EFs:
+        emissions_factor = DEFAULT_EMISSIONS_FACTOR
+    projection = project_lifetime(
+        np.atleast_1d(annual_energy_mwh), emissions_factor,
+        options['years'], options['degradationRate'], options['gridDecarbonization'],
+    )
+    factors = projection.pop('gridEmissionsFactor').tolist()
+    return [
+        {
+            'years': options['years'],
+            'degradationRate': options['degradationRate'],
+            'gridEmissionsFactor': factors,
+            **{key: values[i].tolist() for key, values in projection.items()}
+        }
+        for i in range(projection['energyProduction'].shape[0])
+    ]
+
+
+def add_lifetime_section(result, options, use_country_EFs):
+    """
+    Add the lifetime projection for a single-configuration solar result, if requested.
+
+    Returns:
+        dict: The same result
+    """
+    if options is not None:
+        result['lifetime'] = lifetime_sections(
+            result['energyProduction'], result['gridEmissionsFactor'], use_country_EFs, options
+        )[0]
+    return result
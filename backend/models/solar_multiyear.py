@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+from .pv_fastpath import simulate_pv_totals
+from .solar_calculator import get_solar_weather_data, resolve_emissions_factor, solar_system_layout
+from .weather_grid import PROVIDER_NAMES
+
+# Longest year range one request may ask for
+MAX_YEARS = 30
+
+# Years fetched and simulated at once. Each in-flight year holds one year of hourly
+# arrays, so this also bounds peak memory; the HTTP client still limits requests per host.
+_year_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('MULTI_YEAR_WORKERS', 4)), thread_name_prefix='multiyear'
+)
+
+
+def _simulate_year(latitude, longitude, weather_cell, year, altitude_meters, array_tilt,
+                   orientation, pv_panel_model, inverter_model, number_of_panels):
+    """
+    Fetch and simulate one year. Only the annual totals are returned, so the hourly
+    weather and output can be freed as soon as the year is done.
+    """
+    solar_weather_timeseries, solar_weather_metadata, is_north_america = get_solar_weather_data(
+        latitude, longitude, year, pvgis_hourly=True
+    )
+    # One-off weather: don't fill the in-memory stage caches with it
+    return simulate_pv_totals(
+        solar_weather_timeseries, weather_cell['latitude'], weather_cell['longitude'], altitude_meters,
+        array_tilt, orientation, pv_panel_model, inverter_model, number_of_panels, memoize_site=False,
+    )
+
+
+def calculate_solar_impact_multiyear(
+    area_hectares,
+    location,
+    start_year,
+    end_year,
+    altitude_meters=10,
+    orientation="SOUTH",
+    pv_panel_model="Canadian_Solar_CS5P_220M___2009_",
+    pv_panel_width=1,
+    pv_panel_height=1.7,
+    inverter_model="ABB__MICRO_0_25_I_OUTD_US_208__208V_",
+    array_tilt=None,
+    spacing_factor=1.1,
+    use_country_EFs=True,
+):
+    """
+    Simulate every year from start_year to end_year (inclusive) and summarize the spread
+    of annual energy, e.g. for bankability reports. PSM3 years are used in North America
+    and the PVGIS hourly series elsewhere. Years are processed in parallel, and only
+    their annual totals are kept.
+
+    Returns:
+        dict: Per-year energy production and carbon offset (or the error for years that
+            could not be simulated), plus mean, P50 and P90 annual energy. P90 is the
+            value exceeded in 90% of years, i.e. the 10th percentile.
+    """
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    if end_year - start_year + 1 > MAX_YEARS:
+        raise ValueError(f"At most {MAX_YEARS} years can be simulated at once")
+
+    latitude, longitude, weather_cell, orientation, array_tilt, number_of_panels = solar_system_layout(
+        area_hectares, location, orientation, array_tilt, pv_panel_width, pv_panel_height, spacing_factor
+    )
+
+    futures = {
+        _year_executor.submit(
+            _simulate_year, latitude, longitude, weather_cell, year, altitude_meters, array_tilt,
+            orientation, pv_panel_model, inverter_model, number_of_panels,
+        ): year
+        for year in range(start_year, end_year + 1)
+    }
+    country_name, emissions_factor = resolve_emissions_factor(latitude, longitude, use_country_EFs)
+
+    annual_totals = {}
+    errors = {}
+    for future in as_completed(futures):
+        year = futures[future]
+        try:
+            annual_totals[year] = future.result()
+        except Exception as e:
+            errors[year] = str(e)
+
+    if not annual_totals:
+        raise Exception(f"Failed to simulate any year: {errors[start_year]}")
+
+    years = sorted(annual_totals)
+    annual_ac_energy = np.array([annual_totals[year]['annual_ac_wh'] for year in years]) / 1_000_000  # Convert to MWh
+    annual_dc_energy = np.array([annual_totals[year]['annual_dc_wh'] for year in years]) / 1_000_000
+    if use_country_EFs:
+        # MWh * 1000 kWh/MWh * gCO2e/kWh / 1,000,000 g/t
+        carbon_offset = annual_ac_energy * 1000 * emissions_factor / 1_000_000
+    else:
+        # Assuming average grid carbon intensity of 0.5 tons CO2e per MWh
+        carbon_offset = annual_ac_energy * 0.5
+
+    per_year = [
+        {
+            'year': year,
+            'energyProduction': float(annual_ac_energy[i]),
+            'dcEnergyProduction': float(annual_dc_energy[i]),
+            'carbonOffset': float(carbon_offset[i])
+        }
+        for i, year in enumerate(years)
+    ]
+    per_year += [{'year': year, 'error': error} for year, error in errors.items()]
+    per_year.sort(key=lambda entry: entry['year'])
+
+    return {
+        'landUseType': 'solar',
+        'areaHectares': area_hectares,
+        'location': {
+            'latitude': latitude,
+            'longitude': longitude,
+            'altitude': altitude_meters,
+            'orientation': orientation
+        },
+        'systemSpecs': {
+            'numberOfPanels': number_of_panels,
+            'panelModel': pv_panel_model,
+            'inverterModel': inverter_model,
+            'tilt': array_tilt
+        },
+        'weatherData': {
+            'source': PROVIDER_NAMES[weather_cell['provider']],
+            'startYear': start_year,
+            'endYear': end_year,
+            'cell': {
+                'latitude': weather_cell['latitude'],
+                'longitude': weather_cell['longitude'],
+                'resolutionDegrees': weather_cell['resolutionDegrees']
+            }
+        },
+        'years': per_year,
+        'energyProduction': {
+            'mean': float(annual_ac_energy.mean()),
+            'p50': float(np.percentile(annual_ac_energy, 50)),
+            'p90': float(np.percentile(annual_ac_energy, 10)),
+            'min': float(annual_ac_energy.min()),
+            'max': float(annual_ac_energy.max()),
+            'std': float(annual_ac_energy.std()),
+            'yearsSimulated': len(years)
+        },
+        'carbonOffset': {
+            'mean': float(carbon_offset.mean()),
+            'p50': float(np.percentile(carbon_offset, 50)),
+            'p90': float(np.percentile(carbon_offset, 10))
+        },
+        'country': country_name,
+        'gridEmissionsFactor': emissions_factor
+    }
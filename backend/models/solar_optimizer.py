@@ -0,0 +1,182 @@
+import numpy as np
+from .solar_batch import (
+    DEFAULT_INVERTER_MODEL,
+    DEFAULT_PANEL_MODEL,
+    simulate_pv_configurations,
+)
+from .solar_calculator import (
+    count_panels,
+    get_solar_weather_data,
+    resolve_emissions_factor,
+)
+from .weather_grid import PROVIDER_NAMES, snap_to_weather_grid
+
+# Coarse grid spacing (degrees), the factor each refinement shrinks it by,
+# and the tilt spacing at which the search stops
+COARSE_TILT_STEP = 10
+COARSE_AZIMUTH_STEP = 30
+REFINEMENT_FACTOR = 3
+MIN_TILT_STEP = 0.5
+
+
+def optimize_array_geometry(
+    solar_weather_timeseries,
+    latitude,
+    longitude,
+    altitude_meters,
+    pv_panel_model=DEFAULT_PANEL_MODEL,
+    inverter_model=DEFAULT_INVERTER_MODEL,
+    min_tilt=0,
+    max_tilt=90,
+):
+    """
+    Find the tilt and azimuth with the highest annual AC yield with a coarse-to-fine grid search.
+
+    The first pass covers the whole tilt range and all azimuths on a coarse grid.
+    Each later pass lays a finer 7 x 7 grid over the neighbourhood of the best
+    candidate so far. Every pass is a single simulate_pv_configurations call,
+    and all passes share the site's solar position and weather arrays.
+
+    Returns:
+        dict: best 'tilt', 'azimuth' and per-panel 'annual_ac_wh', plus the number of
+            'evaluations' and 'passes'
+    """
+    evaluated = {}
+
+    def evaluate(candidates):
+        new = [c for c in dict.fromkeys(candidates) if c not in evaluated]
+        if new:
+            configurations = [
+                {'array_tilt': tilt, 'azimuth': azimuth,
+                 'pv_panel_model': pv_panel_model, 'inverter_model': inverter_model}
+                for tilt, azimuth in new
+            ]
+            _, annual_ac_wh = simulate_pv_configurations(
+                solar_weather_timeseries, latitude, longitude, altitude_meters, configurations
+            )
+            evaluated.update(zip(new, annual_ac_wh))
+        return max(evaluated, key=evaluated.get)
+
+    def grid(tilt_center, tilt_step, azimuth_center, azimuth_step, span):
+        tilts = np.clip(tilt_center + tilt_step * np.arange(-span, span + 1), min_tilt, max_tilt)
+        azimuths = np.mod(azimuth_center + azimuth_step * np.arange(-span, span + 1), 360)
+        return [
+            (round(float(tilt), 3), round(float(azimuth), 3))
+            for tilt in tilts for azimuth in azimuths
+        ]
+
+    # Coarse pass over the whole search space
+    tilts = np.append(np.arange(min_tilt, max_tilt, COARSE_TILT_STEP), max_tilt)
+    azimuths = np.arange(0, 360, COARSE_AZIMUTH_STEP)
+    best = evaluate([
+        (round(float(tilt), 3), round(float(azimuth), 3))
+        for tilt in tilts for azimuth in azimuths
+    ])
+    passes = 1
+
+    # Refine around the best candidate until the tilt step is small enough
+    tilt_step = COARSE_TILT_STEP
+    azimuth_step = COARSE_AZIMUTH_STEP
+    while tilt_step > MIN_TILT_STEP:
+        tilt_step /= REFINEMENT_FACTOR
+        azimuth_step /= REFINEMENT_FACTOR
+        best = evaluate(grid(best[0], tilt_step, best[1], azimuth_step, REFINEMENT_FACTOR))
+        passes += 1
+
+    return {
+        'tilt': best[0],
+        'azimuth': best[1],
+        'annual_ac_wh': float(evaluated[best]),
+        'evaluations': len(evaluated),
+        'passes': passes,
+    }
+
+
+def optimize_solar_orientation(
+    area_hectares,
+    location,
+    altitude_meters=10,
+    pv_panel_model=DEFAULT_PANEL_MODEL,
+    inverter_model=DEFAULT_INVERTER_MODEL,
+    simulation_year=2022,
+    pv_panel_width=1,
+    pv_panel_height=1.7,
+    spacing_factor=1.1,
+    use_country_EFs=True,
+):
+    """
+    Find the tilt and azimuth that maximise annual AC energy at a site and compare
+    it with the default layout (tilt = latitude, facing the equator).
+
+    Returns:
+        dict: Optimal geometry with its energy production and carbon offset, plus the default for comparison
+    """
+    latitude = location.lat
+    longitude = location.long
+    weather_cell = snap_to_weather_grid(latitude, longitude)
+
+    solar_weather_timeseries, solar_weather_metadata, is_north_america = get_solar_weather_data(
+        latitude, longitude, simulation_year
+    )
+    site = (solar_weather_timeseries, weather_cell['latitude'], weather_cell['longitude'], altitude_meters)
+
+    optimum = optimize_array_geometry(*site, pv_panel_model=pv_panel_model, inverter_model=inverter_model)
+    default_geometry = {
+        'array_tilt': abs(weather_cell['latitude']),
+        'azimuth': 0 if weather_cell['latitude'] < 0 else 180,
+        'pv_panel_model': pv_panel_model,
+        'inverter_model': inverter_model,
+    }
+    _, default_ac_wh = simulate_pv_configurations(*site, [default_geometry])
+
+    number_of_panels = count_panels(area_hectares, pv_panel_width, pv_panel_height, spacing_factor)
+    country_name, emissions_factor = resolve_emissions_factor(latitude, longitude, use_country_EFs)
+
+    def summarize(tilt, azimuth, annual_ac_wh):
+        annual_ac_energy = annual_ac_wh * number_of_panels / 1_000_000  # Convert to MWh
+        if use_country_EFs:
+            carbon_offset = annual_ac_energy * 1000 * emissions_factor / 1_000_000
+        else:
+            carbon_offset = annual_ac_energy * 0.5
+        return {
+            'tilt': tilt,
+            'azimuth': azimuth,
+            'energyProduction': float(annual_ac_energy),
+            'carbonOffset': float(carbon_offset)
+        }
+
+    best = summarize(optimum['tilt'], optimum['azimuth'], optimum['annual_ac_wh'])
+    default = summarize(default_geometry['array_tilt'], default_geometry['azimuth'], default_ac_wh[0])
+
+    return {
+        'landUseType': 'solar',
+        'areaHectares': area_hectares,
+        'location': {
+            'latitude': latitude,
+            'longitude': longitude,
+            'altitude': altitude_meters
+        },
+        'systemSpecs': {
+            'numberOfPanels': number_of_panels,
+            'panelModel': pv_panel_model,
+            'inverterModel': inverter_model
+        },
+        'weatherData': {
+            'source': PROVIDER_NAMES[weather_cell['provider']],
+            'year': simulation_year,
+            'cell': {
+                'latitude': weather_cell['latitude'],
+                'longitude': weather_cell['longitude'],
+                'resolutionDegrees': weather_cell['resolutionDegrees']
+            }
+        },
+        'optimum': best,
+        'default': default,
+        'gainPercent': (best['energyProduction'] / default['energyProduction'] - 1) * 100 if default['energyProduction'] else None,
+        'search': {
+            'evaluations': optimum['evaluations'],
+            'passes': optimum['passes']
+        },
+        'country': country_name,
+        'gridEmissionsFactor': emissions_factor
+    }
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from .lru_cache import LRUCache
+from .solar_calculator import (
+    create_ac_output_plot,
+    create_weather_plots,
+    get_solar_weather_data,
+    simulate_pv_output,
+    solar_system_layout,
+)
+
+PLOT_TYPES = ('weather', 'acOutput')
+
+# Rendered PNGs (base64) by site/configuration key; each is a few hundred KB at most
+_plot_cache = LRUCache(int(os.environ.get('PLOT_CACHE_SIZE', 64)))
+
+# Rendering is CPU bound, so it runs on a small dedicated pool instead of request threads
+_plot_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PLOT_WORKERS', 2)), thread_name_prefix='plots'
+)
+_pending = {}  # key -> Future for renders in progress
+_pending_lock = threading.Lock()
+
+
+def _render_and_store(key, render, *args):
+    try:
+        image = render(*args)
+        _plot_cache.put(key, image)
+        return image
+    finally:
+        with _pending_lock:
+            _pending.pop(key, None)
+
+
+def submit_plot(key, render, *args):
+    """
+    Get a rendered plot from the cache, or start rendering it on the plot pool.
+    Concurrent requests for the same key share one render.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the base64 PNG
+    """
+    cached = _plot_cache.get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    with _pending_lock:
+        future = _pending.get(key)
+        if future is None:
+            future = _plot_executor.submit(_render_and_store, key, render, *args)
+            _pending[key] = future
+    return future
+
+
+def _render_ac_output(solar_weather_timeseries, latitude, longitude, altitude_meters, array_tilt,
+                      orientation, pv_panel_model, inverter_model, number_of_panels):
+    # The simulation stages are memoized, so this is cheap after /api/calculate
+    pv_output = simulate_pv_output(
+        solar_weather_timeseries, latitude, longitude, altitude_meters, array_tilt,
+        orientation, pv_panel_model, inverter_model, number_of_panels,
+    )
+    return create_ac_output_plot(pv_output)
+
+
+async def render_solar_plots_async(
+    area_hectares,
+    location,
+    altitude_meters=10,
+    orientation="SOUTH",
+    pv_panel_model="Canadian_Solar_CS5P_220M___2009_",
+    pv_panel_width=1,
+    pv_panel_height=1.7,
+    inverter_model="ABB__MICRO_0_25_I_OUTD_US_208__208V_",
+    array_tilt=None,
+    simulation_year=2022,
+    spacing_factor=1.1,
+    plots=PLOT_TYPES,
+):
+    """
+    Render the weather and AC output charts for the same inputs as calculate_solar_impact.
+    Weather is fetched and charts are rendered off the event loop, and the PNGs are
+    cached by weather cell and system configuration.
+
+    Returns:
+        dict: Base64 PNG per requested plot type
+    """
+    unknown = [plot for plot in plots if plot not in PLOT_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown plot types: {', '.join(unknown)}")
+
+    latitude, longitude, weather_cell, orientation, array_tilt, number_of_panels = solar_system_layout(
+        area_hectares, location, orientation, array_tilt, pv_panel_width, pv_panel_height, spacing_factor
+    )
+    solar_weather_timeseries, solar_weather_metadata, is_north_america = await asyncio.to_thread(
+        get_solar_weather_data, latitude, longitude, simulation_year
+    )
+
+    weather_key = (
+        weather_cell['provider'], weather_cell['latitude'], weather_cell['longitude'],
+        simulation_year if is_north_america else 'tmy',
+    )
+    futures = {}
+    if 'weather' in plots:
+        futures['weather'] = submit_plot(
+            ('weather',) + weather_key, create_weather_plots, solar_weather_timeseries
+        )
+    if 'acOutput' in plots:
+        futures['acOutput'] = submit_plot(
+            ('acOutput',) + weather_key
+            + (altitude_meters, array_tilt, orientation, pv_panel_model, inverter_model, number_of_panels),
+            _render_ac_output,
+            solar_weather_timeseries, weather_cell['latitude'], weather_cell['longitude'], altitude_meters,
+            array_tilt, orientation, pv_panel_model, inverter_model, number_of_panels,
+        )
+
+    images = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures.values()))
+    return dict(zip(futures, images))
+
+
+def get_plot_cache_stats():
+    """
+    Get hit/miss counters of the rendered plot cache.
+    """
+    return _plot_cache.stats()
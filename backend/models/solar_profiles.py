@@ -0,0 +1,78 @@
+import numpy as np
+
+# Largest downsampling step the caller may choose (one year)
+MAX_RESOLUTION_HOURS = 8784
+
+
+def parse_timeseries_options(options):
+    """
+    Validate the 'timeseries' request options: 'monthly' and 'monthByHour' (booleans)
+    and 'resolutionHours' (hours per point of the downsampled series, or None to leave it out).
+
+    Returns:
+        dict: Normalized options, or None if no section was requested
+    """
+    if not options:
+        return None
+    if not isinstance(options, dict):
+        raise ValueError("timeseries must be an object")
+
+    resolution_hours = options.get('resolutionHours')
+    if resolution_hours is not None:
+        if isinstance(resolution_hours, bool) or not isinstance(resolution_hours, int) \
+                or not 1 <= resolution_hours <= MAX_RESOLUTION_HOURS:
+            raise ValueError(f"resolutionHours must be an integer from 1 to {MAX_RESOLUTION_HOURS}")
+
+    parsed = {
+        'monthly': bool(options.get('monthly', False)),
+        'monthByHour': bool(options.get('monthByHour', False)),
+        'resolutionHours': resolution_hours,
+    }
+    if not (parsed['monthly'] or parsed['monthByHour'] or resolution_hours):
+        return None
+    return parsed
+
+
+def summarize_hourly_output(hourly_ac_wh, monthly=False, month_by_hour=False, resolution_hours=None):
+    """
+    Condense an hourly AC output series (Wh, whole array) into compact response sections:
+    monthly totals, the average of each hour of the day in each month (12 x 24) and
+    a series downsampled to one point per resolution_hours. All sections come from
+    bincount/reshape over the hourly values, so totals add up to the annual energy.
+
+    Returns:
+        dict: The requested sections
+    """
+    values = np.nan_to_num(hourly_ac_wh.to_numpy(dtype=float))
+    index = hourly_ac_wh.index
+    sections = {}
+
+    if monthly:
+        month = index.month.to_numpy() - 1
+        totals = np.bincount(month, weights=values, minlength=12) / 1_000_000  # Convert to MWh
+        sections['monthly'] = {'units': 'MWh', 'values': totals.tolist()}
+
+    if month_by_hour:
+        cell = (index.month.to_numpy() - 1) * 24 + index.hour.to_numpy()
+        sums = np.bincount(cell, weights=values, minlength=288)
+        counts = np.bincount(cell, minlength=288)
+        with np.errstate(invalid='ignore'):
+            means = (sums / counts / 1000).reshape(12, 24)  # Convert to kWh
+        sections['monthByHour'] = {
+            'units': 'kWh',
+            'values': np.where(counts.reshape(12, 24) > 0, means, 0.0).tolist()
+        }
+
+    if resolution_hours:
+        # Pad to whole buckets, then sum each row of a (buckets, resolution_hours) view
+        buckets = -(-len(values) // resolution_hours)
+        padded = np.zeros(buckets * resolution_hours)
+        padded[:len(values)] = values
+        sections['hourly'] = {
+            'units': 'kWh',
+            'resolutionHours': resolution_hours,
+            'start': index[0].isoformat(),
+            'values': (padded.reshape(buckets, resolution_hours).sum(axis=1) / 1000).tolist()  # Convert to kWh
+        }
+
+    return sections
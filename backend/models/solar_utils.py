@@ -1,4 +1,5 @@
-import reverse_geocoder as rg
+import numpy as np
+from .country_lookup import get_country_lookup
 
 
 _emissions_factors = None  # Module-level cache
@@ -234,7 +235,21 @@ def get_country_name_for_emissions(latitude, longitude):
     Get the country name as it appears in the emissions data file
     from coordinates
     """
-    coordinates = (latitude, longitude)
-    result = rg.search(coordinates)
-    iso_code = result[0]['cc']
-    return COUNTRY_MAPPING_IFI.get(iso_code)
+    iso_code = get_country_lookup().iso_codes([latitude], [longitude])[0]
+    return COUNTRY_MAPPING_IFI.get(str(iso_code))
+
+def get_emissions_factors_for_coordinates(latitudes, longitudes):
+    """
+    Resolve many coordinates to ISO country codes, emissions data file country names
+    and grid emissions factors (gCO2e/kWh) with one nearest-neighbour query.
+    Each distinct country is mapped once.
+
+    Returns:
+        tuple: (iso_codes, country_names, emissions_factors) arrays; names and
+            factors are None where the country is not in the data file
+    """
+    iso_codes = get_country_lookup().iso_codes(latitudes, longitudes)
+    unique_codes, inverse = np.unique(iso_codes, return_inverse=True)
+    names = np.array([COUNTRY_MAPPING_IFI.get(str(code)) for code in unique_codes], dtype=object)
+    factors = np.array([get_emissions_factor(name) for name in names], dtype=object)
+    return iso_codes, names[inverse].reshape(iso_codes.shape), factors[inverse].reshape(iso_codes.shape)
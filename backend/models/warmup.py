@@ -0,0 +1,54 @@
+import time
+from .admin_boundaries import get_admin_boundaries
+from .country_lookup import get_country_lookup
+from .geocoding import get_geocode_cache
+from .http_client import get_session
+from .reforestation_calculator import get_address_cache, get_winrock_data
+from .solar_batch import DEFAULT_INVERTER_MODEL, DEFAULT_PANEL_MODEL
+from .solar_calculator import get_inverter_specs, get_panel_specs
+from .solar_utils import get_emissions_factor
+from .weather_cache import get_weather_cache
+from .yield_surface import get_yield_surface
+
+
+def _load_default_models():
+    get_panel_specs(DEFAULT_PANEL_MODEL)
+    get_inverter_specs(DEFAULT_INVERTER_MODEL)
+
+
+# Everything the request path would otherwise load on first use, in order
+_WARMUP_STEPS = [
+    ('models', _load_default_models),
+    ('emissionsFactors', lambda: get_emissions_factor(None)),
+    ('countryLookup', get_country_lookup),
+    ('winrockData', get_winrock_data),
+    ('addressCache', get_address_cache),
+    ('adminBoundaries', get_admin_boundaries),
+    ('geocodeCache', get_geocode_cache),
+    ('yieldSurface', get_yield_surface),
+    ('weatherCache', get_weather_cache),
+    ('httpSession', get_session),
+]
+
+
+def warm_up():
+    """
+    Preload the data the request path needs, so the first request in a worker does
+    not pay for it. Call once at startup (before forking, when workers are preloaded).
+    A failing step is reported and skipped; the request path loads it on demand.
+
+    Returns:
+        dict: Seconds spent on each step
+    """
+    timings = {}
+    for name, step in _WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {str(e)}")
+        timings[name] = time.perf_counter() - start
+
+    print(f"Warm-up complete in {sum(timings.values()):.2f}s: "
+          + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    return timings
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Default location of the on-disk cache, relative to backend directory
+_DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'cache' / 'weather'
+
+_weather_cache = None  # Module-level cache instance
+_weather_cache_lock = threading.Lock()
+
+
+def _json_default(value):
+    """
+    Make numpy scalars and other odd metadata values JSON serializable.
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class WeatherCache:
+    """
+    Persistent cache of solar weather downloads.
+
+    Each entry is one compressed .npz file holding the timeseries column by column
+    (plus the UTC index and timezone) and the provider metadata as JSON. Entries
+    expire after `ttl_seconds`, and once the directory grows past `max_bytes` the
+    least recently used files are deleted. Recency is tracked through the file
+    mtime, so it is shared by every worker process using the same directory.
+    """
+
+    def __init__(self, cache_dir, max_bytes, ttl_seconds):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(provider, latitude, longitude, year):
+        """
+        Build the cache key for a provider, location and year.
+        Coordinates are written with four decimals, the precision PSM3 requests use.
+        """
+        return f"{provider}_{float(latitude):.4f}_{float(longitude):.4f}_{year}"
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, provider, latitude, longitude, year):
+        """
+        Look up cached weather data.
+
+        Returns:
+            tuple: (timeseries, metadata), or None on a miss or expired entry
+        """
+        path = self._path(self.make_key(provider, latitude, longitude, year))
+        try:
+            with np.load(path) as npz:
+                header = json.loads(str(npz['header']))
+                if time.time() - header['created'] > self.ttl_seconds:
+                    entry = None
+                else:
+                    index = pd.to_datetime(npz['index'], utc=True)
+                    if header['tz']:
+                        index = index.tz_convert(header['tz'])
+                    else:
+                        index = index.tz_localize(None)
+                    index.name = header['index_name']
+                    timeseries = pd.DataFrame(
+                        {column: npz[f'c{i}'] for i, column in enumerate(header['columns'])},
+                        index=index,
+                    )
+                    entry = (timeseries, header['metadata'])
+        except (OSError, KeyError, ValueError):
+            entry = None
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Refresh recency for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, provider, latitude, longitude, year, timeseries, metadata):
+        """
+        Store weather data, then evict least recently used entries if the cache
+        is over its size limit. Frames with non-numeric columns are not cached.
+        """
+        columns = list(timeseries.columns)
+        arrays = {}
+        for i, column in enumerate(columns):
+            values = timeseries[column].to_numpy()
+            if values.dtype.kind not in 'biuf':
+                return
+            arrays[f'c{i}'] = values
+
+        index = pd.DatetimeIndex(timeseries.index)
+        header = {
+            'created': time.time(),
+            'columns': [str(column) for column in columns],
+            'tz': str(index.tz) if index.tz is not None else '',
+            'index_name': index.name,
+            'metadata': metadata,
+        }
+        arrays['header'] = np.array(json.dumps(header, default=_json_default))
+        arrays['index'] = index.asi8
+
+        path = self._path(self.make_key(provider, latitude, longitude, year))
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing weather cache entry {path.name}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Delete least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total_bytes = 0
+        for path in self.cache_dir.glob('*.npz'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+
+        if total_bytes <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        """
+        Get hit/miss counters for this process and the current size on disk.
+        """
+        sizes = []
+        for path in self.cache_dir.glob('*.npz'):
+            # Entries may be evicted meanwhile, by this process or another worker
+            try:
+                sizes.append(path.stat().st_size)
+            except OSError:
+                continue
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(sizes),
+                'sizeBytes': sum(sizes),
+                'maxBytes': self.max_bytes,
+            }
+
+
+def get_weather_cache():
+    """
+    Get the shared weather cache, creating it from environment settings if needed:
+    WEATHER_CACHE_DIR, WEATHER_CACHE_MAX_MB (default 512) and WEATHER_CACHE_TTL_DAYS (default 30).
+    """
+    global _weather_cache
+    if _weather_cache is None:
+        with _weather_cache_lock:
+            if _weather_cache is None:
+                _weather_cache = WeatherCache(
+                    cache_dir=os.environ.get('WEATHER_CACHE_DIR', _DEFAULT_CACHE_DIR),
+                    max_bytes=int(float(os.environ.get('WEATHER_CACHE_MAX_MB', 512)) * 1024 * 1024),
+                    ttl_seconds=float(os.environ.get('WEATHER_CACHE_TTL_DAYS', 30)) * 24 * 3600,
+                )
+    return _weather_cache
@@ -0,0 +1,40 @@
+# Approximate native grid spacing of each weather provider, in degrees.
+# NSRDB PSM3 cells are ~4 km (0.04°); PVGIS TMY is built from ~5 km satellite data (0.05°).
+PROVIDER_GRID_DEGREES = {
+    'psm3': 0.04,
+    'pvgis': 0.05,
+}
+
+PROVIDER_NAMES = {
+    'psm3': 'NREL PSM3',
+    'pvgis': 'PVGIS',
+}
+
+
+def get_weather_provider(latitude, longitude):
+    """
+    Pick the weather provider for a location: NREL PSM3 for (roughly) North America,
+    PVGIS for the rest of the world.
+    """
+    is_north_america = (-170 <= longitude <= -50) and (15 <= latitude <= 72)
+    return 'psm3' if is_north_america else 'pvgis'
+
+
+def snap_to_weather_grid(latitude, longitude):
+    """
+    Snap coordinates to the nearest node of the provider's native grid (the nearest
+    multiple of its spacing), so that clicks within the cell of half a spacing around
+    a node share one download and one simulation.
+    The provider is chosen from the raw coordinates.
+
+    Returns:
+        dict: provider, latitude/longitude of the grid node and the spacing in degrees
+    """
+    provider = get_weather_provider(latitude, longitude)
+    step = PROVIDER_GRID_DEGREES[provider]
+    return {
+        'provider': provider,
+        'latitude': round(round(latitude / step) * step, 4),
+        'longitude': round(round(longitude / step) * step, 4),
+        'resolutionDegrees': step,
+    }
@@ -0,0 +1,181 @@
+import json
+import warnings
+from collections.abc import Mapping
+from pathlib import Path
+import numpy as np
+
+# Prebuilt by data/preprocess_Winrock_data.py
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+VALUES_FILE = 'Winrock_values.npy'
+INDEX_FILE = 'Winrock_index.json'
+AGGREGATES_FILE = 'Winrock_aggregates.npy'
+
+# Country aggregates are kept for all units and for the units carrying each of these flags
+AGGREGATE_FLAGS = ['Coastal', 'NatRegen']
+STATISTICS = ['median', 'mean']
+
+# Written for missing values, as in Winrock_data.json
+MISSING = 'N/A'
+
+
+class _CountryUnits(Mapping):
+    """
+    Read-only view of one country's units: unit name -> {column heading: value}.
+    """
+
+    def __init__(self, store, start, end):
+        self._store = store
+        self._start = start
+        self._end = end
+
+    def __getitem__(self, unit):
+        row = self._store.unit_row(self._start, unit)
+        if row is None:
+            raise KeyError(unit)
+        return self._store.row_values(row)
+
+    def __iter__(self):
+        return iter(self._store.unit_names[self._start:self._end])
+
+    def __len__(self):
+        return self._end - self._start
+
+    def rows(self):
+        """
+        Returns:
+            slice: The country's rows in the value matrix
+        """
+        return slice(self._start, self._end)
+
+
+class WinrockStore(Mapping):
+    """
+    Winrock sequestration rates as one memory-mapped float64 matrix (one row per
+    subnational unit, NaN for missing values) plus a JSON index of column headings,
+    unit names in row order and each country's row range.
+
+    Reads like the nested dict of Winrock_data.json (country -> unit -> column ->
+    value, with 'N/A' for missing values), but every worker shares the same pages.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        data_dir = Path(data_dir)
+        with open(data_dir / INDEX_FILE, encoding='utf-8') as f:
+            index = json.load(f)
+        self.values = np.load(data_dir / VALUES_FILE, mmap_mode='r')
+        self.aggregates = np.load(data_dir / AGGREGATES_FILE, mmap_mode='r')
+        self.aggregate_subsets = index['aggregateSubsets']
+        self.country_numbers = {country: i for i, country in enumerate(index['countries'])}
+        self.columns = index['columns']
+        self.unit_names = index['units']
+        self.country_rows = {country: tuple(rows) for country, rows in index['countries'].items()}
+        # (country start row, unit) -> row; unit names are only unique within a country
+        self._rows = {
+            (start, self.unit_names[row]): row
+            for start, end in self.country_rows.values() for row in range(start, end)
+        }
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+
+    def __getitem__(self, country):
+        start, end = self.country_rows[country]
+        return _CountryUnits(self, start, end)
+
+    def __iter__(self):
+        return iter(self.country_rows)
+
+    def __len__(self):
+        return len(self.country_rows)
+
+    def unit_row(self, country_start, unit):
+        """
+        Returns:
+            int: Row of a unit of the country whose rows start at country_start, or None
+        """
+        return self._rows.get((country_start, unit))
+
+    def _as_dict(self, values):
+        values = np.asarray(values, dtype=float)
+        return {
+            column: MISSING if np.isnan(value) else float(value)
+            for column, value in zip(self.columns, values)
+        }
+
+    def row_values(self, row):
+        """
+        Returns:
+            dict: Column heading -> value for one row, with 'N/A' for missing values
+        """
+        return self._as_dict(self.values[row])
+
+    def country_aggregate(self, country, statistic='median', flag=None):
+        """
+        Precomputed median or mean of every column over a country's units, or over
+        only the units carrying a flag from AGGREGATE_FLAGS.
+
+        Returns:
+            dict: Column heading -> value, with 'N/A' where no unit has a value
+        """
+        subset = 'all' if flag is None else flag
+        return self._as_dict(self.aggregates[
+            self.country_numbers[country], self.aggregate_subsets.index(subset), STATISTICS.index(statistic)
+        ])
+
+
+def _aggregate_rows(rows):
+    """
+    Median and mean of each column over some rows, ignoring NaN.
+
+    Returns:
+        np.ndarray: Shape (len(STATISTICS), columns)
+    """
+    with warnings.catch_warnings():
+        # Columns without any value stay NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.stack([np.nanmedian(rows, axis=0), np.nanmean(rows, axis=0)])
+
+
+def build_winrock_store(data):
+    """
+    Turn Winrock data in its nested dict form into the store layout, with the
+    per-country aggregates.
+
+    Returns:
+        tuple: (float64 value matrix, float64 aggregates of shape
+            (countries, subsets, statistics, columns), index dict)
+    """
+    columns = list(next(iter(next(iter(data.values())).values())))
+    units = []
+    countries = {}
+    rows = []
+    for country, country_units in data.items():
+        start = len(units)
+        for unit, values in country_units.items():
+            units.append(unit)
+            rows.append([
+                np.nan if not isinstance(values.get(column), (int, float)) else float(values[column])
+                for column in columns
+            ])
+        countries[country] = [start, len(units)]
+
+    values = np.array(rows, dtype=np.float64)
+
+    subsets = ['all'] + AGGREGATE_FLAGS
+    aggregates = np.full((len(countries), len(subsets), len(STATISTICS), len(columns)), np.nan)
+    for i, (start, end) in enumerate(countries.values()):
+        country_values = values[start:end]
+        aggregates[i, 0] = _aggregate_rows(country_values)
+        for j, flag in enumerate(AGGREGATE_FLAGS, start=1):
+            flagged = country_values[country_values[:, columns.index(flag)] == 1]
+            if len(flagged):
+                aggregates[i, j] = _aggregate_rows(flagged)
+
+    index = {'columns': columns, 'units': units, 'countries': countries, 'aggregateSubsets': subsets}
+    return values, aggregates, index
+
+
+def save_winrock_store(values, aggregates, index, data_dir=DEFAULT_DATA_DIR):
+    data_dir = Path(data_dir)
+    np.save(data_dir / VALUES_FILE, values)
+    np.save(data_dir / AGGREGATES_FILE, aggregates)
+    with open(data_dir / INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
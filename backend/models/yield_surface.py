@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+# Default location of the prebuilt surface (see data/build_yield_surface.py)
+_DEFAULT_SURFACE_PATH = Path(__file__).parent.parent / 'data' / 'yield_surface.npy'
+
+# Layers of the surface array, shape (layers, latitudes, longitudes)
+AC_LAYER = 0
+DC_LAYER = 1
+
+_yield_surface = None  # Module-level surface instance
+_yield_surface_loaded = False
+_yield_surface_lock = threading.Lock()
+
+
+class YieldSurface:
+    """
+    Global grid of annual specific yield (kWh/kWp/yr) for the default solar layout,
+    memory-mapped from a .npy file with a JSON header next to it.
+
+    The header records the grid origin and spacing plus the panel, inverter, year
+    and altitude the surface was simulated with. Grid nodes without weather data
+    hold NaN.
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        with open(path.with_suffix('.json')) as f:
+            self.header = json.load(f)
+        self.values = np.load(path, mmap_mode='r')
+        self.lat_min = self.header['latMin']
+        self.lon_min = self.header['lonMin']
+        self.step = self.header['stepDegrees']
+
+    def matches(self, pv_panel_model, inverter_model):
+        return (
+            pv_panel_model == self.header['panelModel']
+            and inverter_model == self.header['inverterModel']
+        )
+
+    def specific_yield(self, latitude, longitude):
+        """
+        Bilinearly interpolate the surface at a location.
+
+        Returns:
+            tuple: (ac, dc) specific yield in kWh/kWp/yr, or None outside the grid
+                or next to a node without data
+        """
+        _, n_lat, n_lon = self.values.shape
+        y = (latitude - self.lat_min) / self.step
+        x = (longitude - self.lon_min) / self.step
+        if not (0 <= y <= n_lat - 1 and 0 <= x <= n_lon - 1):
+            return None
+
+        i = min(int(y), n_lat - 2)
+        j = min(int(x), n_lon - 2)
+        fy = y - i
+        fx = x - j
+        corners = np.asarray(self.values[:, i:i + 2, j:j + 2], dtype=float)
+        if np.isnan(corners).any():
+            return None
+
+        weights = np.array([[(1 - fy) * (1 - fx), (1 - fy) * fx], [fy * (1 - fx), fy * fx]])
+        ac, dc = (corners[AC_LAYER] * weights).sum(), (corners[DC_LAYER] * weights).sum()
+        return float(ac), float(dc)
+
+
+def get_yield_surface():
+    """
+    Get the shared yield surface from YIELD_SURFACE_PATH (default data/yield_surface.npy).
+
+    Returns:
+        YieldSurface: The surface, or None if it has not been built
+    """
+    global _yield_surface, _yield_surface_loaded
+    if not _yield_surface_loaded:
+        with _yield_surface_lock:
+            if not _yield_surface_loaded:
+                path = os.environ.get('YIELD_SURFACE_PATH', _DEFAULT_SURFACE_PATH)
+                try:
+                    _yield_surface = YieldSurface(path)
+                except (OSError, KeyError, ValueError) as e:
+                    print(f"Yield surface not available: {str(e)}")
+                    _yield_surface = None
+                _yield_surface_loaded = True
+    return _yield_surface
+
+
+def estimate_annual_energy(
+    latitude,
+    longitude,
+    weather_cell,
+    orientation,
+    array_tilt,
+    pv_panel_model,
+    inverter_model,
+    number_of_panels,
+):
+    """
+    Estimate annual DC/AC energy from the yield surface instead of running the simulation.
+
+    Only the layout the surface was built for is estimated: its panel and inverter,
+    facing the equator at a tilt of abs(latitude). Altitude is ignored.
+
+    Returns:
+        tuple: (annual_dc_wh, annual_ac_wh, surface_header), or None when the
+            surface is missing, does not cover the location or the layout differs
+    """
+    surface = get_yield_surface()
+    if surface is None or not surface.matches(pv_panel_model, inverter_model):
+        return None
+
+    equator_facing = 0 if weather_cell['latitude'] < 0 else 180
+    if orientation != equator_facing or abs(array_tilt - abs(weather_cell['latitude'])) > 1e-9:
+        return None
+
+    specific_yield = surface.specific_yield(latitude, longitude)
+    if specific_yield is None:
+        return None
+
+    ac, dc = specific_yield
+    capacity_kwp = surface.header['panelKwp'] * number_of_panels
+    return dc * capacity_kwp * 1000, ac * capacity_kwp * 1000, surface.header
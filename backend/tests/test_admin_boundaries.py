@@ -0,0 +1,105 @@
+import pytest
+from models.admin_boundaries import AdminBoundaries, build_admin_boundaries, save_admin_boundaries
+
+# Winrock data only needs the country -> unit names for matching
+WINROCK_DATA = {'Brazil': {'Assis': {}, 'Bauru': {}}}
+
+
+def square(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+def feature(name, country, country_iso, geometry_type, coordinates):
+    return {
+        'properties': {'name': name, 'admin': country, 'iso_a2': country_iso},
+        'geometry': {'type': geometry_type, 'coordinates': coordinates},
+    }
+
+
+ASSIS_WITH_HOLE = feature('Assis', 'Brazil', 'BR', 'Polygon', [
+    square(-51, -23, -50, -22), square(-50.6, -22.6, -50.4, -22.4),
+])
+# Fills Assis's hole, plus a separate square elsewhere
+NOWHERE = feature('Nowhere', 'Brazil', 'BR', 'MultiPolygon', [
+    [square(-50.6, -22.6, -50.4, -22.4)], [square(-40, -10, -39, -9)],
+])
+ATLANTIS = feature('Atlantis', 'Atlantis', 'ZZ', 'Polygon', [square(0, 0, 1, 1)])
+
+
+def filler_squares(count):
+    """
+    Small squares on a regular grid away from the other features, enough for several tree levels.
+    """
+    return [
+        feature(f'filler{i}', 'Atlantis', 'ZZ', 'Polygon', [square(100 + (i % 50) * 0.5, (i // 50) * 0.5, 100.1 + (i % 50) * 0.5, 0.1 + (i // 50) * 0.5)])
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope='module')
+def boundaries():
+    index = build_admin_boundaries([ASSIS_WITH_HOLE, NOWHERE, ATLANTIS] + filler_squares(2000), WINROCK_DATA)
+    assert len(index['levels']) > 2
+    return AdminBoundaries(index)
+
+
+def test_matches_winrock_unit(boundaries):
+    region = boundaries.resolve(-22.2, -50.9)
+    assert region['name'] == 'Assis'
+    assert region['country'] == 'Brazil'
+    assert region['subnationalUnit'] == 'Assis'
+    assert region['matchInfo']['source'] == 'boundaries'
+    assert region['matchInfo']['match_type'] == 'exact'
+
+
+def test_hole_belongs_to_the_polygon_filling_it(boundaries):
+    region = boundaries.resolve(-22.5, -50.5)
+    assert region['name'] == 'Nowhere'
+    assert region['country'] == 'Brazil'
+    assert region['subnationalUnit'] is None
+    # Second polygon of the MultiPolygon
+    assert boundaries.resolve(-9.5, -39.5)['name'] == 'Nowhere'
+
+
+def test_hole_without_filling_polygon_is_outside():
+    only_assis = AdminBoundaries(build_admin_boundaries([ASSIS_WITH_HOLE], WINROCK_DATA))
+    assert only_assis.resolve(-22.5, -50.5) is None
+    assert only_assis.resolve(-22.9, -50.1)['name'] == 'Assis'
+
+
+def test_country_outside_winrock(boundaries):
+    region = boundaries.resolve(0.5, 0.5)
+    assert region['name'] == 'Atlantis'
+    assert region['country'] is None
+
+
+def test_point_outside_every_polygon(boundaries):
+    assert boundaries.resolve(5, 5) is None
+    assert boundaries.resolve(0.05, 100.3) is None
+
+
+def test_finds_every_packed_polygon(boundaries):
+    for i in (0, 49, 50, 777, 1999):
+        region = boundaries.resolve((i // 50) * 0.5 + 0.05, 100 + (i % 50) * 0.5 + 0.05)
+        assert region['name'] == f'filler{i}'
+
+
+def test_single_leaf_tree():
+    index = build_admin_boundaries([ATLANTIS], WINROCK_DATA)
+    assert len(index['levels']) == 1
+    single = AdminBoundaries(index)
+    assert single.resolve(0.5, 0.5)['name'] == 'Atlantis'
+    assert single.resolve(1.5, 0.5) is None
+
+
+def test_resolve_many(boundaries):
+    regions = boundaries.resolve_many([-22.2, -22.5, 0.5, 5], [-50.9, -50.5, 0.5, 5])
+    assert [region and region['name'] for region in regions] == ['Assis', 'Nowhere', 'Atlantis', None]
+
+
+def test_saved_index_resolves_the_same(boundaries, tmp_path):
+    index = build_admin_boundaries([ASSIS_WITH_HOLE, NOWHERE, ATLANTIS] + filler_squares(100), WINROCK_DATA)
+    save_admin_boundaries(index, tmp_path)
+    loaded = AdminBoundaries.load(tmp_path)
+    for latitude, longitude in [(-22.2, -50.9), (-22.5, -50.5), (0.5, 0.5), (5, 5)]:
+        assert loaded.resolve(latitude, longitude) == boundaries.resolve(latitude, longitude)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pvlib
+import pytest
+from models.pv_fastpath import FLOAT32_RTOL, FLOAT64_RTOL, simulate_pv_totals
+from models.solar_calculator import simulate_pv_output
+
+PANEL_MODEL = "Canadian_Solar_CS5P_220M___2009_"
+INVERTER_MODEL = "ABB__MICRO_0_25_I_OUTD_US_208__208V_"
+NUMBER_OF_PANELS = 10
+
+
+def synthetic_weather(latitude, longitude, altitude_meters):
+    """
+    One year of hourly clear-sky irradiance with a daily temperature cycle and a varying wind.
+    """
+    index = pd.date_range('2022-01-01', periods=8760, freq='h', tz='UTC')
+    clearsky = pvlib.location.Location(latitude, longitude, altitude=altitude_meters).get_clearsky(index)
+    hours = np.arange(len(index))
+    return pd.DataFrame({
+        'ghi': clearsky['ghi'],
+        'dni': clearsky['dni'],
+        'dhi': clearsky['dhi'],
+        'temp_air': 15 + 10 * np.sin(2 * np.pi * (hours % 24 - 9) / 24),
+        'wind_speed': 1 + (hours % 7) * 0.5,
+    }, index=index)
+
+
+SITES = [(38.56, -121.48, 10), (-33.9, 18.4, 50)]
+GEOMETRIES = [(38.56, 180), (20, 135), (0, 180), (60, 270)]
+
+
+@pytest.mark.parametrize('latitude, longitude, altitude_meters', SITES)
+@pytest.mark.parametrize('use_float32, rtol', [(False, FLOAT64_RTOL), (True, FLOAT32_RTOL)])
+def test_fast_path_within_documented_tolerance(latitude, longitude, altitude_meters, use_float32, rtol):
+    weather = synthetic_weather(latitude, longitude, altitude_meters)
+    for array_tilt, orientation in GEOMETRIES:
+        reference = simulate_pv_output(
+            weather, latitude, longitude, altitude_meters, array_tilt, orientation,
+            PANEL_MODEL, INVERTER_MODEL, NUMBER_OF_PANELS,
+        )
+        totals = simulate_pv_totals(
+            weather, latitude, longitude, altitude_meters, array_tilt, orientation,
+            PANEL_MODEL, INVERTER_MODEL, NUMBER_OF_PANELS, use_float32=use_float32,
+        )
+        assert totals['annual_dc_wh'] == pytest.approx(reference['DC Output (Wh)'].sum(), rel=rtol)
+        assert totals['annual_ac_wh'] == pytest.approx(reference['AC Output (Wh)'].sum(), rel=rtol)